@@ -2,13 +2,18 @@
 import requests
 import time
 import base64
+import threading
 from functools import lru_cache
+from requests.adapters import HTTPAdapter
 
 BASE = "https://api.companieshouse.gov.uk"
 DOC_API = "https://document-api.companieshouse.gov.uk"
 FRONTEND_DOC_API = "https://frontend-doc-api.company-information.service.gov.uk"
 CONVERT_IXBRL_API = "https://convert-ixbrl.co.uk"
 
+# Connections kept alive per host — enough for concurrent document downloads
+DOC_POOL_SIZE = 16
+
 
 class CompaniesHouseClient:
     def __init__(self, api_key):
@@ -17,6 +22,8 @@ class CompaniesHouseClient:
         self.session.auth = (api_key, "")
         self.session.headers.update({"Accept": "application/json"})
         self._last_call = 0
+        # Documents are fetched from several threads at once — keep the spacing
+        self._rate_lock = threading.Lock()
 
         # Separate session for document API (needs different auth handling)
         self._doc_session = requests.Session()
@@ -25,11 +32,23 @@ class CompaniesHouseClient:
             "Authorization": f"Basic {encoded_key}",
         })
 
+        # Unauthenticated session for third-party lookups (Gazette, convert-ixbrl)
+        # so they reuse connections instead of a fresh TLS handshake per call
+        self._ext_session = requests.Session()
+        self._ext_session.headers.update({"User-Agent": "Clearview/1.0"})
+
+        # Documents download from several threads at once; keep a warm
+        # keep-alive connection for each rather than the default pool of 10
+        for session in (self.session, self._doc_session, self._ext_session):
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=DOC_POOL_SIZE)
+            session.mount("https://", adapter)
+
     def _rate_limit(self):
-        elapsed = time.time() - self._last_call
-        if elapsed < 0.1:
-            time.sleep(0.1 - elapsed)
-        self._last_call = time.time()
+        with self._rate_lock:
+            elapsed = time.time() - self._last_call
+            if elapsed < 0.1:
+                time.sleep(0.1 - elapsed)
+            self._last_call = time.time()
 
     def _get(self, url, **kwargs):
         self._rate_limit()
@@ -103,9 +122,8 @@ class CompaniesHouseClient:
                 "results-page-size": 5,
             }
             self._rate_limit()
-            resp = requests.get(url, params=params, timeout=8, headers={
+            resp = self._ext_session.get(url, params=params, timeout=8, headers={
                 "Accept": "application/json",
-                "User-Agent": "Clearview/1.0"
             })
             if resp.status_code == 200:
                 try:
@@ -146,10 +164,20 @@ class CompaniesHouseClient:
     def get_document_content(self, document_metadata_url):
         """Download iXBRL/XHTML or PDF document content.
 
+        Returns: (content_bytes, content_type_string) or (None, None)
+        """
+        content_url, accept = self.get_document_metadata(document_metadata_url)
+        if not content_url:
+            return None, None
+        return self.get_document_body(content_url, accept)
+
+    def get_document_metadata(self, document_metadata_url):
+        """Find where a filing's document lives and its best format, without downloading it.
+
         Filing history gives URLs on document-api.company-information.service.gov.uk
         but metadata must be fetched from frontend-doc-api.company-information.service.gov.uk
 
-        Returns: (content_bytes, content_type_string) or (None, None)
+        Returns: (content_url, mime_type) preferring iXBRL over PDF, or (None, None)
         """
         # Rewrite the URL to use the correct domain for metadata
         meta_url = document_metadata_url
@@ -185,13 +213,17 @@ class CompaniesHouseClient:
 
         # Prefer iXBRL, fall back to PDF
         if "application/xhtml+xml" in resources:
-            accept = "application/xhtml+xml"
-        elif "application/pdf" in resources:
-            accept = "application/pdf"
-        else:
-            print(f"    [doc] No iXBRL or PDF available")
-            return None, None
+            return content_url, "application/xhtml+xml"
+        if "application/pdf" in resources:
+            return content_url, "application/pdf"
+        print(f"    [doc] No iXBRL or PDF available")
+        return None, None
+
+    def get_document_body(self, content_url, accept):
+        """Download a document found by get_document_metadata.
 
+        Returns: (content_bytes, content_type_string) or (None, None)
+        """
         print(f"    [doc] Downloading ({accept}): {content_url[:80]}...")
         self._rate_limit()
 
@@ -224,7 +256,7 @@ class CompaniesHouseClient:
         print(f"  [convert-ixbrl] Trying fallback: {url}")
 
         try:
-            resp = requests.get(url, timeout=15, headers={
+            resp = self._ext_session.get(url, timeout=15, headers={
                 "Accept": "application/json"
             })
             if resp.status_code != 200:
@@ -275,16 +307,23 @@ class CompaniesHouseClient:
             return None
 
 
-def build_company_data(client, number):
-    """Fetch all data for a company and structure it for the frontend."""
+def build_company_data(client, number, on_filings=None):
+    """Fetch all data for a company and structure it for the frontend.
+
+    on_filings, if given, is called with the accounts filings as soon as they're
+    known, so the caller can start downloading documents while the rest loads.
+    """
     profile = client.get_profile(number)
     if not profile:
         return None
 
+    accounts_filings = client.get_accounts_filings(number, count=5)
+    if on_filings:
+        on_filings(accounts_filings)
+
     officers_raw = client.get_officers(number)
     psc_raw = client.get_psc(number)
     charges_raw = client.get_charges(number)
-    accounts_filings = client.get_accounts_filings(number, count=5)
     insolvency_raw = client.get_insolvency(number)
     try:
         gazette_notices = client.get_gazette_notices(profile.get("company_name", ""), number)
@@ -98,7 +98,8 @@ RATIO_WEIGHTS = {
 
 def _safe_div(a, b):
     """Safe division returning None if either value is None or b is 0."""
-    if a is None or b is None or b == 0:
+    # `not b` covers both None and zero in one truth test
+    if a is None or not b:
         return None
     return a / b
 
@@ -281,26 +282,27 @@ def score_stability(company_data):
     # 2.4 Director Stability
     officers = company_data.get("officers", [])
     today = date.today()
-    active_directors = []
+    n_active = 0
     recent_resignations = 0
 
+    # Single pass — count active directors and recent resignations together
     for o in officers:
-        is_director = "director" in (o.get("role", "")).lower()
-        if not is_director:
+        if "director" not in o.get("role", "").lower():
             continue
 
-        if o.get("resigned"):
-            try:
-                resigned_date = datetime.strptime(o["resigned"], "%Y-%m-%d").date()
-                months_since = (today - resigned_date).days / 30.44
-                if months_since <= 24:
-                    recent_resignations += 1
-            except (ValueError, TypeError):
-                pass
-        else:
-            active_directors.append(o)
+        resigned = o.get("resigned")
+        if not resigned:
+            n_active += 1
+            continue
+        try:
+            resigned_date = datetime.strptime(resigned, "%Y-%m-%d").date()
+            months_since = (today - resigned_date).days / 30.44
+            if months_since <= 24:
+                recent_resignations += 1
+        except (ValueError, TypeError):
+            pass
 
-    if len(active_directors) <= 1:
+    if n_active <= 1:
         adjustment -= 5
         signals.append(("Only 1 active director", -5, "caution"))
 
@@ -311,7 +313,7 @@ def score_stability(company_data):
         penalty = min(recent_resignations * 5, 15)
         adjustment -= penalty
         signals.append((f"{recent_resignations} director resignation(s) recently", -penalty, "risk"))
-    elif len(active_directors) >= 2:
+    elif n_active >= 2:
         adjustment += 10
         signals.append(("Stable board", +10, "positive"))
 
@@ -0,0 +1,118 @@
+"""Clearview — On-disk cache for expensive lookups.
+
+PDF extraction (text walk + Claude call) and Gazette searches give the same
+answer for the same input, so their results are kept as small JSON files
+named by a hash of the key. Survives server restarts and repeat runs.
+
+Expired entries are deleted when read. Every PRUNE_EVERY writes the directory
+is trimmed back to MAX_BYTES (1 GiB by default), oldest files first.
+
+Set CLEARVIEW_NO_CACHE=1 to bypass it, CLEARVIEW_CACHE_DIR to move it,
+CLEARVIEW_CACHE_MAX_BYTES to change the size cap.
+"""
+
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+
+CACHE_DIR = os.environ.get("CLEARVIEW_CACHE_DIR",
+                           os.path.join(tempfile.gettempdir(), "clearview_cache"))
+DISABLED = os.environ.get("CLEARVIEW_NO_CACHE", "") == "1"
+MAX_BYTES = int(os.environ.get("CLEARVIEW_CACHE_MAX_BYTES", 2 ** 30))
+
+# Walking the directory costs a stat per file, so only check the size every N writes
+PRUNE_EVERY = 100
+_writes = 0
+_prune_lock = threading.Lock()
+
+
+def content_key(prefix, data):
+    """Build a cache key from a hash of raw bytes (e.g. a PDF)."""
+    return f"{prefix}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+
+
+def _path(key):
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, digest[:2], digest + ".json")
+
+
+def get(key, ttl):
+    """Return the cached value for key, or None if missing, older than ttl seconds, or disabled."""
+    if DISABLED:
+        return None
+    path = _path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            os.remove(path)
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def put(key, value):
+    """Store a JSON-serialisable value. Failures are logged, never raised."""
+    if DISABLED:
+        return
+    path = _path(key)
+    tmp = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent readers never see a half-written file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"[Cache] Could not write {key}: {e}")
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+        return
+
+    global _writes
+    with _prune_lock:
+        _writes += 1
+        due = _writes % PRUNE_EVERY == 0
+    if due:
+        _prune()
+
+
+def _prune():
+    """Delete the oldest entries until the cache fits in MAX_BYTES."""
+    entries = []
+    total = 0
+    for root, _, files in os.walk(CACHE_DIR):
+        for name in files:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= MAX_BYTES:
+        return
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        if total <= MAX_BYTES:
+            break
+    print(f"[Cache] Pruned {removed} old entries to stay under {MAX_BYTES:,} bytes")
+
+
+def clear():
+    """Remove every cached entry."""
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
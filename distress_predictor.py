@@ -9,10 +9,38 @@ No sklearn dependency needed — uses pure Python with exported lookup tables.
 import os
 import json
 import math
-from datetime import datetime
+from bisect import bisect_left, bisect_right
+from datetime import date
 
 _model = None
 
+# Multipliers used when the model file doesn't provide its own value
+ADJUSTMENT_DEFAULTS = {
+    "accounts_overdue": 2.0,
+    "num_outstanding_charges": 1.5,
+    "days_since_filing_800": 1.3,
+    "days_since_filing_200": 0.9,
+    "num_charges_5": 1.2,
+    "num_charges_10": 1.4,
+    "net_assets_negative": 3.0,
+    "current_ratio_0.3": 2.5,
+    "current_ratio_0.5": 1.8,
+    "current_ratio_0.8": 1.3,
+    "current_ratio_2.5": 0.7,
+    "retained_negative": 1.6,
+}
+
+HIGH_RISK_SECTORS = frozenset([41, 42, 43, 56, 68, 47, 49])
+# Account types in base-rate table order
+ACC_CODE = {"dormant": 0, "micro": 1, "small": 2, "full": 3}
+
+# Upper bounds (exclusive) of each risk band; anything above the last is very_high
+RISK_BAND_THRESHOLDS = (0.02, 0.05, 0.10, 0.20, 0.40)
+RISK_BANDS = ("very_low", "low", "moderate", "elevated", "high", "very_high")
+
+SECTOR_NAMES = {41: "Construction", 42: "Civil engineering", 43: "Specialist construction",
+                56: "Food & beverage", 68: "Real estate", 47: "Retail", 49: "Transport"}
+
 
 def _load_model():
     """Load model weights from JSON file. Returns default rates if not available."""
@@ -72,6 +100,20 @@ def _load_model():
                     key = f"{age_b}_{hr}_{acc}"
                     _model["base_rates"][key] = round(base, 6)
 
+    # Resolve multipliers once so scoring doesn't re-apply defaults per call
+    _model["_adjustments"] = {**ADJUSTMENT_DEFAULTS, **_model.get("adjustments", {})}
+    _model["_age_buckets"] = _model.get("age_buckets", [0.5, 1, 2, 3, 5, 8, 12, 20, 50])
+
+    # Base rates as [age_bucket][high_risk][acc_code] so scoring indexes
+    # directly instead of formatting a "5_1_small" key per call
+    base_rates = _model.get("base_rates", {})
+    baseline = _model.get("baseline_prob", 0.02)
+    _model["_base_rate_table"] = [
+        [[base_rates.get(f"{age_b}_{hr}_{acc}", baseline) for acc in ACC_CODE]
+         for hr in (0, 1)]
+        for age_b in _model["_age_buckets"]
+    ]
+
     return _model
 
 
@@ -99,11 +141,13 @@ def predict_distress(company_data, financials=None):
 
     # ── Extract features from company data ──
 
+    # Dates are compared as day ordinals against a single "today"
+    today = date.today().toordinal()
+
     # Age
     doc = company_data.get("date_of_creation", "")
     try:
-        inc_date = datetime.strptime(doc[:10], "%Y-%m-%d")
-        age_years = (datetime.now() - inc_date).days / 365.25
+        age_years = (today - date.fromisoformat(doc[:10]).toordinal()) / 365.25
     except Exception:
         age_years = 5  # default
         confidence = "low"
@@ -117,6 +161,17 @@ def predict_distress(company_data, financials=None):
         except (ValueError, IndexError):
             pass
 
+    # High risk sector
+    high_risk = 1 if sic_2digit in HIGH_RISK_SECTORS else 0
+
+    # Insolvency history — an active case overrides everything below, so
+    # skip the rest of feature extraction and scoring
+    insolvency = company_data.get("insolvency", {})
+    if insolvency.get("has_active_case", False):
+        return _finish(model, 0.95, [("Active insolvency proceeding", "critical")], "high",
+                       age_years, sic_2digit, high_risk)
+    past_insolvency_cases = len(insolvency.get("cases", []))
+
     # Account type
     acc_type_raw = company_data.get("accounts", {}).get("last_accounts", {}).get("type", "")
     acc_type = "micro"  # default
@@ -127,10 +182,6 @@ def predict_distress(company_data, financials=None):
     elif "medium" in acc_type_raw.lower() or "full" in acc_type_raw.lower():
         acc_type = "full"
 
-    # High risk sector
-    high_risk_sectors = [41, 42, 43, 56, 68, 47, 49]
-    high_risk = 1 if sic_2digit in high_risk_sectors else 0
-
     # Charges
     charges = company_data.get("charges", {})
     num_charges = charges.get("total", 0) or 0
@@ -143,30 +194,17 @@ def predict_distress(company_data, financials=None):
     last_made_up = company_data.get("accounts", {}).get("last_accounts", {}).get("made_up_to", "")
     days_since_filing = 400  # default
     try:
-        last_date = datetime.strptime(last_made_up[:10], "%Y-%m-%d")
-        days_since_filing = (datetime.now() - last_date).days
+        days_since_filing = today - date.fromisoformat(last_made_up[:10]).toordinal()
     except Exception:
         pass
 
-    # Insolvency history
-    insolvency = company_data.get("insolvency", {})
-    has_active_insolvency = insolvency.get("has_active_case", False)
-    past_insolvency_cases = len(insolvency.get("cases", []))
-
     # ── Look up base rate ──
 
-    base_rates = model.get("base_rates", {})
-    age_buckets = model.get("age_buckets", [0.5, 1, 2, 3, 5, 8, 12, 20, 50])
-
-    # Find age bucket
-    age_bucket = age_buckets[-1]
-    for bucket in age_buckets:
-        if age_years <= bucket:
-            age_bucket = bucket
-            break
+    age_buckets = model["_age_buckets"]
 
-    key = f"{age_bucket}_{high_risk}_{acc_type}"
-    base_prob = base_rates.get(key, model.get("baseline_prob", 0.02))
+    # Find age bucket — first bucket >= age, else the oldest
+    age_idx = min(bisect_left(age_buckets, age_years), len(age_buckets) - 1)
+    base_prob = model["_base_rate_table"][age_idx][high_risk][ACC_CODE[acc_type]]
 
     # Sector-specific rate
     sector_rates = model.get("sector_rates", {})
@@ -179,11 +217,11 @@ def predict_distress(company_data, financials=None):
 
     # ── Apply adjustments ──
 
-    adjustments = model.get("adjustments", {})
+    adjustments = model["_adjustments"]
 
     # Accounts overdue
     if accounts_overdue:
-        mult = adjustments.get("accounts_overdue", 2.0)
+        mult = adjustments["accounts_overdue"]
         prob *= mult
         factors.append(("Accounts are overdue", "increases_risk"))
 
@@ -194,26 +232,26 @@ def predict_distress(company_data, financials=None):
 
     # Outstanding charges
     if num_outstanding > 0:
-        mult = adjustments.get("num_outstanding_charges", 1.5)
+        mult = adjustments["num_outstanding_charges"]
         prob *= mult
         if num_outstanding >= 3:
             factors.append((f"{num_outstanding} outstanding charges", "increases_risk"))
 
     # Days since filing
     if days_since_filing > 800:
-        mult = adjustments.get("days_since_filing_800", 1.3)
+        mult = adjustments["days_since_filing_800"]
         prob *= mult
         factors.append(("Very old accounts on file", "increases_risk"))
     elif days_since_filing < 300:
-        mult = adjustments.get("days_since_filing_200", 0.9)
+        mult = adjustments["days_since_filing_200"]
         prob *= mult
 
     # Charges count
     if num_charges >= 5:
-        mult = adjustments.get("num_charges_5", 1.2)
+        mult = adjustments["num_charges_5"]
         prob *= mult
     elif num_charges >= 10:
-        mult = adjustments.get("num_charges_10", 1.4)
+        mult = adjustments["num_charges_10"]
         prob *= mult
 
     # ── Financial ratio adjustments (when we have data) ──
@@ -230,7 +268,7 @@ def predict_distress(company_data, financials=None):
 
         # Negative net assets — strong failure signal
         if na is not None and na < 0:
-            mult = adjustments.get("net_assets_negative", 3.0)
+            mult = adjustments["net_assets_negative"]
             prob *= mult
             factors.append(("Negative net assets", "major_risk"))
 
@@ -238,25 +276,25 @@ def predict_distress(company_data, financials=None):
         if ca is not None and cl is not None and cl > 0:
             current_ratio = ca / cl
             if current_ratio < 0.5:
-                mult = adjustments.get("current_ratio_0.3", 2.5)
+                mult = adjustments["current_ratio_0.3"]
                 prob *= mult
                 factors.append(("Current ratio below 0.5 — severe liquidity risk", "major_risk"))
             elif current_ratio < 0.8:
-                mult = adjustments.get("current_ratio_0.5", 1.8)
+                mult = adjustments["current_ratio_0.5"]
                 prob *= mult
                 factors.append(("Current ratio below 0.8 — liquidity concern", "increases_risk"))
             elif current_ratio < 1.0:
-                mult = adjustments.get("current_ratio_0.8", 1.3)
+                mult = adjustments["current_ratio_0.8"]
                 prob *= mult
                 factors.append(("Current ratio below 1.0", "slight_risk"))
             elif current_ratio > 2.0:
-                mult = adjustments.get("current_ratio_2.5", 0.7)
+                mult = adjustments["current_ratio_2.5"]
                 prob *= mult
                 factors.append(("Strong current ratio", "reduces_risk"))
 
         # Negative retained earnings
         if re is not None and re < 0:
-            mult = adjustments.get("retained_negative", 1.6)
+            mult = adjustments["retained_negative"]
             prob *= mult
             factors.append(("Accumulated losses (negative retained earnings)", "increases_risk"))
 
@@ -296,16 +334,15 @@ def predict_distress(company_data, financials=None):
         factors.append(("Limited financial data — using company profile only", "note"))
         confidence = "low"
 
-    # ── Active insolvency = near-certain ──
-    if has_active_insolvency:
-        prob = 0.95
-        factors = [("Active insolvency proceeding", "critical")]
-        confidence = "high"
-
-    if past_insolvency_cases > 0 and not has_active_insolvency:
+    if past_insolvency_cases > 0:
         prob *= 2.0
         factors.append(("Past insolvency history", "increases_risk"))
 
+    return _finish(model, prob, factors, confidence, age_years, sic_2digit, high_risk)
+
+
+def _finish(model, prob, factors, confidence, age_years, sic_2digit, high_risk):
+    """Apply age/sector factors, clamp, band and build the result dict."""
     # ── Age-based factors ──
     if age_years < 2:
         factors.append(("Company less than 2 years old — higher base failure rate", "increases_risk"))
@@ -314,27 +351,14 @@ def predict_distress(company_data, financials=None):
         prob *= 0.8
 
     if high_risk:
-        sector_names = {41: "Construction", 42: "Civil engineering", 43: "Specialist construction",
-                        56: "Food & beverage", 68: "Real estate", 47: "Retail", 49: "Transport"}
-        name = sector_names.get(sic_2digit, "this sector")
+        name = SECTOR_NAMES.get(sic_2digit, "this sector")
         factors.append((f"{name} has above-average failure rates", "increases_risk"))
 
     # ── Clamp probability ──
     prob = max(0.001, min(0.95, prob))
 
     # ── Risk band ──
-    if prob < 0.02:
-        risk_band = "very_low"
-    elif prob < 0.05:
-        risk_band = "low"
-    elif prob < 0.10:
-        risk_band = "moderate"
-    elif prob < 0.20:
-        risk_band = "elevated"
-    elif prob < 0.40:
-        risk_band = "high"
-    else:
-        risk_band = "very_high"
+    risk_band = RISK_BANDS[bisect_right(RISK_BAND_THRESHOLDS, prob)]
 
     return {
         "probability": round(prob, 4),
@@ -26,12 +26,99 @@ different risk than one going £100K → £120K → £150K.
 
 import os
 import sys
+import tempfile
 import warnings
 import numpy as np
 import pandas as pd
-from datetime import datetime
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+
+# Narrow dtypes for the profile feature columns — flags are 0/1, SIC
+# divisions < 100, days_since_filing is clipped to 0..3650 (999 = unknown)
+PROFILE_DTYPES = {
+    "failed": "int8",
+    "age_years": "float32",
+    "sic_2digit": "uint8",
+    "acc_dormant": "int8",
+    "acc_micro": "int8",
+    "acc_small": "int8",
+    "acc_full": "int8",
+    "is_plc": "int8",
+    "is_llp": "int8",
+    "num_charges": "uint16",
+    "num_outstanding": "uint16",
+    "accounts_overdue": "int8",
+    "days_since_filing": "uint16",
+    "conf_overdue": "int8",
+    "high_risk_sector": "int8",
+}
+
+# BasicCompanyData writes every date as dd/mm/yyyy
+PROFILE_DATE_FORMAT = "%d/%m/%Y"
+
+# Financial ratios don't need float64 precision
+FIN_FLOAT32_COLS = [
+    "fin_current_ratio", "fin_cash_ratio", "fin_leverage",
+    "na_pct_change", "cr_trend", "ta_pct_change", "to_pct_change",
+]
+
+
+# Key for company numbers that don't fit 8 bytes — never produced by a real
+# number (those are all printable ASCII), and dropped before any join
+INVALID_KEY = np.uint64(0)
+
+
+def _company_key(numbers):
+    """Pack company numbers into uint64 join keys.
+
+    CH numbers are 8 ASCII chars once zero-padded (digits, or a two-letter
+    prefix like "SC"), so the padded bytes fit one big-endian uint64 exactly
+    and sort the same way as the strings. Purely numeric values are packed
+    arithmetically; only the rest go through str.zfill. Anything longer than
+    8 chars can't be packed without truncating (and colliding with another
+    company), so it gets INVALID_KEY instead.
+    """
+    num = pd.to_numeric(numbers, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    numeric = (num >= 0) & (num < 1e8) & (num == np.floor(num))
+
+    keys = np.zeros(len(num), dtype=np.uint64)
+    n = np.where(numeric, num, 0).astype(np.uint64)
+    for p in range(7, -1, -1):
+        keys = (keys << np.uint64(8)) | (np.uint64(0x30) + (n // np.uint64(10 ** p)) % np.uint64(10))
+
+    if not numeric.all():
+        rest = pd.Series(numbers).iloc[np.flatnonzero(~numeric)].astype(str).str.strip()
+        fits = (rest.str.len() <= 8).to_numpy()
+        padded = np.asarray(rest[fits].str.zfill(8), dtype="S8")
+        rest_keys = np.full(len(rest), INVALID_KEY, dtype=np.uint64)
+        rest_keys[fits] = np.frombuffer(padded.tobytes(), dtype=">u8")
+        keys[~numeric] = rest_keys
+        if not fits.all():
+            print(f"  Warning: {(~fits).sum():,} company numbers longer than 8 chars — left unmatched")
+    return keys
 
-warnings.filterwarnings("ignore")
+
+def _company_number(keys):
+    """Unpack `_company_key` keys back into zero-padded company number strings."""
+    raw = np.asarray(keys, dtype=np.uint64).astype(">u8")
+    return np.frombuffer(raw.tobytes(), dtype="S8").astype(str)
+
+
+def _lower_categorical(series):
+    """Lower-case a low-cardinality string column as a categorical.
+
+    Status/category columns only hold a handful of distinct values, so the
+    string work runs once per category instead of once per row. NaN becomes "".
+    """
+    cat = series.astype("category")
+    lowered = pd.Index(list(cat.cat.categories.astype(str).str.lower()) + [""])
+    inverse, uniques = pd.factorize(lowered)
+    # code -1 (NaN) indexes the trailing "" entry
+    codes = inverse[cat.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques),
+                     index=series.index)
 
 
 def load_profiles(csv_path):
@@ -41,54 +128,74 @@ def load_profiles(csv_path):
     (Same logic as train_profile.py but returns more columns)
     """
     print(f"\n[3.1] Loading profile data: {csv_path}")
-    now = datetime(2026, 2, 1)
+    now = pd.Timestamp("2026-02-01")
+    min_date = pd.Timestamp("1900-01-01")
+    max_date = now
     chunk_size = 200000
-    all_rows = []
     total = 0
+    n_batches = 0
+
+    # Normalise column names from the header row, then find columns flexibly
+    header = pd.read_csv(csv_path, nrows=0, encoding="latin-1").columns
+    col_map = {c: c.strip().replace(" ", "").replace(".", "_") for c in header}
+    lowered = {col: col.lower() for col in col_map.values()}
+
+    def fc(cands):
+        for c in cands:
+            c = c.lower()
+            m = [col for col, low in lowered.items() if c in low]
+            if m:
+                return m[0]
+        return None
+
+    num_col = fc(["CompanyNumber"])
+    status_col = fc(["CompanyStatus"])
+    inc_col = fc(["IncorporationDate"])
+    cat_col = fc(["CompanyCategory"])
+    acc_cat_col = fc(["AccountCategory"])
+    sic_col = fc(["SicText_1", "SICCode_SicText_1"])
+    mort_col = fc(["NumMortCharges", "Mortgages_NumMortCharges"])
+    mort_out_col = fc(["NumMortOutstanding", "Mortgages_NumMortOutstanding"])
+    acc_due_col = fc(["NextDueDate", "Accounts_NextDueDate"])
+    acc_made_col = fc(["LastMadeUpDate", "Accounts_LastMadeUpDate"])
+    conf_due_col = fc(["ConfStmtNextDueDate"])
+
+    if not status_col or not inc_col or not num_col:
+        print("[!!] Missing essential columns")
+        return None
+
+    print(f"  Columns detected: num={num_col}, status={status_col}")
+
+    # Only parse the ~11 columns we use out of BasicCompanyData's ~55
+    used = {num_col, status_col, inc_col, cat_col, acc_cat_col, sic_col, mort_col,
+            mort_out_col, acc_due_col, acc_made_col, conf_due_col} - {None}
+    usecols = [raw for raw, col in col_map.items() if col in used]
+
+    # Processed chunks are streamed to an on-disk Arrow IPC file instead of
+    # being held in a list and concatenated — peak memory is one chunk plus
+    # the final table, with no concat copy.
+    fd, ipc_path = tempfile.mkstemp(prefix="profiles_", suffix=".arrow")
+    os.close(fd)
+    sink = None
+    writer = None
+
+    def dates(values):
+        # Parse with the fixed profile format; out-of-range → NaT
+        d = pd.to_datetime(values, format=PROFILE_DATE_FORMAT, errors="coerce", cache=True)
+        return d.where((d >= min_date) & (d <= max_date))
 
     for chunk_num, chunk in enumerate(pd.read_csv(csv_path, low_memory=False,
                                                     encoding="latin-1",
+                                                    usecols=usecols,
                                                     chunksize=chunk_size)):
         total += len(chunk)
-
-        # Normalise column names
-        col_map = {c: c.strip().replace(" ", "").replace(".", "_") for c in chunk.columns}
         chunk.rename(columns=col_map, inplace=True)
 
-        # Find columns flexibly
-        def fc(cands):
-            for c in cands:
-                m = [col for col in chunk.columns if c.lower() in col.lower()]
-                if m:
-                    return m[0]
-            return None
-
-        num_col = fc(["CompanyNumber"])
-        status_col = fc(["CompanyStatus"])
-        inc_col = fc(["IncorporationDate"])
-        cat_col = fc(["CompanyCategory"])
-        acc_cat_col = fc(["AccountCategory"])
-        sic_col = fc(["SicText_1", "SICCode_SicText_1"])
-        mort_col = fc(["NumMortCharges", "Mortgages_NumMortCharges"])
-        mort_out_col = fc(["NumMortOutstanding", "Mortgages_NumMortOutstanding"])
-        acc_due_col = fc(["NextDueDate", "Accounts_NextDueDate"])
-        acc_made_col = fc(["LastMadeUpDate", "Accounts_LastMadeUpDate"])
-        conf_due_col = fc(["ConfStmtNextDueDate"])
-
-        if not status_col or not inc_col or not num_col:
-            if chunk_num == 0:
-                print("[!!] Missing essential columns")
-                return None
-            continue
-
-        if chunk_num == 0:
-            print(f"  Columns detected: num={num_col}, status={status_col}")
-
         # Company number
-        chunk["company_number"] = chunk[num_col].astype(str).str.strip().str.zfill(8)
+        chunk["co_key"] = _company_key(chunk[num_col])
 
         # Status → failure label
-        status = chunk[status_col].fillna("").str.lower()
+        status = _lower_categorical(chunk[status_col])
         chunk["failed"] = status.isin([
             "liquidation", "receivership", "administration",
             "voluntary arrangement", "insolvency proceedings"
@@ -101,14 +208,10 @@ def load_profiles(csv_path):
             )
             chunk.loc[dwd, "failed"] = 1
 
-        chunk["company_status"] = status
+        chunk["company_status"] = status.astype(str)
 
         # Age
-        min_date = pd.Timestamp("1900-01-01")
-        max_date = pd.Timestamp("2026-02-01")
-        inc_dates = pd.to_datetime(chunk[inc_col], dayfirst=True, errors="coerce")
-        inc_dates = inc_dates.where((inc_dates >= min_date) & (inc_dates <= max_date))
-        chunk["age_years"] = (pd.Timestamp(now) - inc_dates).dt.days / 365.25
+        chunk["age_years"] = (now - dates(chunk[inc_col])).dt.days / 365.25
 
         # SIC code
         if sic_col:
@@ -122,7 +225,7 @@ def load_profiles(csv_path):
 
         # Account category flags
         if acc_cat_col:
-            ar = chunk[acc_cat_col].fillna("").str.lower()
+            ar = _lower_categorical(chunk[acc_cat_col])
             chunk["acc_dormant"] = ar.str.contains("dormant").astype(int)
             chunk["acc_micro"] = ar.str.contains("micro").astype(int)
             chunk["acc_small"] = ar.str.contains("small").astype(int)
@@ -133,7 +236,7 @@ def load_profiles(csv_path):
 
         # Company type
         if cat_col:
-            cr = chunk[cat_col].fillna("").str.lower()
+            cr = _lower_categorical(chunk[cat_col])
             chunk["is_plc"] = cr.str.contains("public").astype(int)
             chunk["is_llp"] = cr.str.contains("llp|partnership").astype(int)
         else:
@@ -143,32 +246,27 @@ def load_profiles(csv_path):
         # Charges
         chunk["num_charges"] = pd.to_numeric(
             chunk.get(mort_col, pd.Series(dtype=float)), errors="coerce"
-        ).fillna(0)
+        ).fillna(0).clip(0, 65535)
         chunk["num_outstanding"] = pd.to_numeric(
             chunk.get(mort_out_col, pd.Series(dtype=float)), errors="coerce"
-        ).fillna(0)
+        ).fillna(0).clip(0, 65535)
 
         # Accounts overdue
         if acc_due_col:
-            due = pd.to_datetime(chunk[acc_due_col], dayfirst=True, errors="coerce")
-            due = due.where((due >= min_date) & (due <= max_date))
-            chunk["accounts_overdue"] = (due < pd.Timestamp(now)).fillna(False).astype(int)
+            # NaT compares False, so missing dates are never overdue
+            chunk["accounts_overdue"] = (dates(chunk[acc_due_col]) < now).astype(int)
         else:
             chunk["accounts_overdue"] = 0
 
         # Days since last filing
         if acc_made_col:
-            made = pd.to_datetime(chunk[acc_made_col], dayfirst=True, errors="coerce")
-            made = made.where((made >= min_date) & (made <= max_date))
-            chunk["days_since_filing"] = (pd.Timestamp(now) - made).dt.days.clip(0, 3650).fillna(999)
+            chunk["days_since_filing"] = (now - dates(chunk[acc_made_col])).dt.days.clip(0, 3650).fillna(999)
         else:
             chunk["days_since_filing"] = 999
 
         # Confirmation statement overdue
         if conf_due_col:
-            conf_due = pd.to_datetime(chunk[conf_due_col], dayfirst=True, errors="coerce")
-            conf_due = conf_due.where((conf_due >= min_date) & (conf_due <= max_date))
-            chunk["conf_overdue"] = (conf_due < pd.Timestamp(now)).fillna(False).astype(int)
+            chunk["conf_overdue"] = (dates(chunk[conf_due_col]) < now).astype(int)
         else:
             chunk["conf_overdue"] = 0
 
@@ -177,26 +275,101 @@ def load_profiles(csv_path):
 
         # Keep relevant columns
         keep = [
-            "company_number", "failed", "company_status",
+            "co_key", "failed", "company_status",
             "age_years", "sic_2digit", "acc_dormant", "acc_micro", "acc_small", "acc_full",
             "is_plc", "is_llp", "num_charges", "num_outstanding",
             "accounts_overdue", "days_since_filing", "conf_overdue", "high_risk_sector",
         ]
         valid = chunk[chunk["age_years"].notna() & (chunk["age_years"] > 0)][keep]
-        all_rows.append(valid)
+        valid = valid.astype(PROFILE_DTYPES)
+        if writer is None:
+            batch = pa.RecordBatch.from_pandas(valid, preserve_index=False)
+            schema = batch.schema
+            sink = pa.OSFile(ipc_path, "wb")
+            writer = ipc.new_stream(sink, schema)
+        else:
+            # Cast to the first chunk's schema so dtypes stay consistent
+            batch = pa.RecordBatch.from_pandas(valid, schema=schema,
+                                               preserve_index=False)
+        writer.write_batch(batch)
+        n_batches += 1
 
         if chunk_num % 5 == 0:
             print(f"    {total:,} rows processed...")
 
-    print(f"[3.1] Combining {len(all_rows)} chunks...")
-    df = pd.concat(all_rows, ignore_index=True)
-    del all_rows
+    if writer is None:
+        os.remove(ipc_path)
+        print("[!!] No profile rows read")
+        return None
+    writer.close()
+    sink.close()
+
+    print(f"[3.1] Combining {n_batches} chunks...")
+    try:
+        with pa.memory_map(ipc_path, "r") as source:
+            table = ipc.open_stream(source).read_all()
+            df = table.to_pandas(split_blocks=True, self_destruct=True)
+            del table
+    finally:
+        os.remove(ipc_path)
 
     print(f"  Total companies: {len(df):,}")
     print(f"  Failed: {df['failed'].sum():,} ({df['failed'].mean() * 100:.2f}%)")
     return df
 
 
+LATEST_FIELDS = [
+    "net_assets", "total_assets", "current_assets",
+    "current_liabilities", "cash", "retained_earnings",
+    "turnover", "net_profit", "employees",
+    "non_current_liabilities", "fixed_assets",
+    "share_capital", "total_liabilities",
+]
+
+
+def _field_history(accts, field):
+    """Summarise one field's reported history per company.
+
+    Works on the non-null rows only (like `years_data[field].dropna()`), so
+    "prev" is the previous *reported* value, not the previous calendar year.
+    `accts` must already be sorted by co_key + year.
+
+    Returns DataFrame indexed by co_key with columns:
+      last, prev, change, prev_change, first, count, decline_run
+    """
+    sub = accts.loc[accts[field].notna(), ["co_key", field]]
+    co = sub["co_key"]
+    vals = sub[field]
+    g = vals.groupby(co, sort=False)
+
+    prev = g.shift(1)
+    change = vals - prev
+    prev_change = change.groupby(co, sort=False).shift(1)
+
+    # Trailing run of declines = rows after the last non-declining row.
+    # The first row of each company has no change, so a break always exists.
+    pos = g.cumcount()
+    last_break = pos.where(~(change < 0)).groupby(co, sort=False).max()
+
+    is_last = ~co.duplicated(keep="last")
+    hist = pd.DataFrame({
+        "last": vals[is_last].to_numpy(),
+        "prev": prev[is_last].to_numpy(),
+        "change": change[is_last].to_numpy(),
+        "prev_change": prev_change[is_last].to_numpy(),
+        "pos": pos[is_last].to_numpy(),
+    }, index=co[is_last].to_numpy())
+    hist["first"] = g.first()
+    hist["count"] = hist.pop("pos") + 1
+    hist["decline_run"] = hist["count"] - 1 - last_break
+    return hist
+
+
+def _pct_change(hist):
+    """Latest change as % of the previous value (None where |prev| <= 100)."""
+    return (hist["change"] / hist["prev"].abs() * 100).where(hist["prev"].abs() > 100)
+
+
 def build_financial_features(accounts_parquet):
     """Build per-company financial trajectory features from accounts data.
 
@@ -205,145 +378,107 @@ def build_financial_features(accounts_parquet):
     - Trends (direction and rate of change)
     - Consecutive decline counts
     - Ratios and their trends
+
+    Everything is computed column-wise over the whole table (groupby shift /
+    cumcount / last-row masks) — there is no per-company Python loop.
     """
     print(f"\n[3.2] Loading parsed accounts: {accounts_parquet}")
-    accts = pd.read_parquet(accounts_parquet)
+    # Only read the columns the features use; fields the parser never
+    # produced come back as all-NaN columns
+    needed = ["company_number", "year"] + LATEST_FIELDS
+    available = set(pq.read_schema(accounts_parquet).names)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        accts = pd.read_parquet(accounts_parquet, engine="pyarrow",
+                                columns=[c for c in needed if c in available])
+    accts = accts.reindex(columns=needed)
     print(f"  Rows: {len(accts):,} | Companies: {accts['company_number'].nunique():,}")
 
-    # Ensure company_number is zero-padded string
-    accts["company_number"] = accts["company_number"].astype(str).str.strip().str.zfill(8)
+    # Key on the zero-padded number; the string is only rebuilt per company
+    accts["co_key"] = _company_key(accts.pop("company_number"))
+    accts = accts[accts["co_key"] != INVALID_KEY]
 
-    # Sort by company + year for trajectory calculation
-    accts = accts.sort_values(["company_number", "year"]).reset_index(drop=True)
+    # Sort by company + year for trajectory calculation. co_key orders like
+    # the padded string, so one stable lexsort on numeric keys does it.
+    order = np.lexsort((accts["year"].to_numpy(), accts["co_key"].to_numpy()))
+    accts = accts.take(order).reset_index(drop=True)
 
     print("\n[3.3] Computing per-company financial features...")
-    features = []
-    grouped = accts.groupby("company_number")
-    total_groups = len(grouped)
-
-    for i, (co_num, group) in enumerate(grouped):
-        if i % 100000 == 0 and i > 0:
-            print(f"    {i:,}/{total_groups:,} companies processed...")
-
-        row = {"company_number": co_num}
-        years_data = group.sort_values("year")
-        n_years = len(years_data)
-
-        # ── Latest values ──
-        latest = years_data.iloc[-1]
-        row["fin_years_available"] = n_years
-        row["latest_year"] = int(latest.get("year", 0))
-
-        for field in ["net_assets", "total_assets", "current_assets",
-                      "current_liabilities", "cash", "retained_earnings",
-                      "turnover", "net_profit", "employees",
-                      "non_current_liabilities", "fixed_assets",
-                      "share_capital", "total_liabilities"]:
-            val = latest.get(field)
-            if pd.notna(val):
-                row[f"fin_{field}"] = float(val)
-
-        # ── Net assets trajectory ──
-        na_series = years_data["net_assets"].dropna()
-        if len(na_series) >= 2:
-            vals = na_series.values
-            # Year-on-year changes
-            changes = np.diff(vals)
-            row["na_latest_change"] = float(changes[-1])
-            row["na_avg_change"] = float(np.mean(changes))
-
-            # Is it declining?
-            row["na_declining"] = int(changes[-1] < 0)
-
-            # Consecutive years of decline
-            consecutive = 0
-            for c in reversed(changes):
-                if c < 0:
-                    consecutive += 1
-                else:
-                    break
-            row["na_years_declining"] = consecutive
-
-            # Rate of change (percentage)
-            if abs(vals[-2]) > 100:  # Avoid division by tiny numbers
-                row["na_pct_change"] = float(changes[-1] / abs(vals[-2]) * 100)
-            else:
-                row["na_pct_change"] = 0.0
-
-            # Acceleration: is decline getting worse?
-            if len(changes) >= 2:
-                row["na_accelerating"] = int(changes[-1] < changes[-2])
-
-            # Has equity turned negative?
-            row["na_negative"] = int(vals[-1] < 0)
-            row["na_was_positive_now_negative"] = int(vals[-1] < 0 and vals[0] > 0)
-
-        # ── Current ratio trajectory ──
-        ca = years_data["current_assets"].dropna()
-        cl = years_data["current_liabilities"].dropna()
-        if len(ca) >= 1 and len(cl) >= 1:
-            # Latest current ratio
-            ca_latest = latest.get("current_assets")
-            cl_latest = latest.get("current_liabilities")
-            if pd.notna(ca_latest) and pd.notna(cl_latest) and abs(cl_latest) > 0:
-                row["fin_current_ratio"] = float(ca_latest / abs(cl_latest))
-
-        # Compute current ratio per year for trend
-        cr_values = []
-        for _, yr_row in years_data.iterrows():
-            ca_v = yr_row.get("current_assets")
-            cl_v = yr_row.get("current_liabilities")
-            if pd.notna(ca_v) and pd.notna(cl_v) and abs(cl_v) > 0:
-                cr_values.append(ca_v / abs(cl_v))
-        if len(cr_values) >= 2:
-            row["cr_trend"] = float(cr_values[-1] - cr_values[-2])
-            row["cr_declining"] = int(cr_values[-1] < cr_values[-2])
-
-        # ── Cash position ──
-        cash_v = latest.get("cash")
-        cl_v = latest.get("current_liabilities")
-        if pd.notna(cash_v) and pd.notna(cl_v) and abs(cl_v) > 0:
-            row["fin_cash_ratio"] = float(cash_v / abs(cl_v))
-
-        # ── Leverage ratio ──
-        ta = latest.get("total_assets")
-        tl = latest.get("total_liabilities")
-        if pd.notna(ta) and pd.notna(tl) and abs(ta) > 0:
-            row["fin_leverage"] = float(abs(tl) / abs(ta))
-
-        # ── Asset shrinkage ──
-        ta_series = years_data["total_assets"].dropna()
-        if len(ta_series) >= 2:
-            ta_vals = ta_series.values
-            row["ta_shrinking"] = int(ta_vals[-1] < ta_vals[-2])
-            if abs(ta_vals[-2]) > 100:
-                row["ta_pct_change"] = float((ta_vals[-1] - ta_vals[-2]) / abs(ta_vals[-2]) * 100)
-
-        # ── Retained earnings trajectory ──
-        re_series = years_data["retained_earnings"].dropna()
-        if len(re_series) >= 2:
-            re_vals = re_series.values
-            row["re_declining"] = int(re_vals[-1] < re_vals[-2])
-            row["re_negative"] = int(re_vals[-1] < 0)
-
-        # ── Turnover trajectory (if available — small/full accounts) ──
-        to_series = years_data["turnover"].dropna()
-        if len(to_series) >= 2:
-            to_vals = to_series.values
-            row["to_declining"] = int(to_vals[-1] < to_vals[-2])
-            if abs(to_vals[-2]) > 100:
-                row["to_pct_change"] = float((to_vals[-1] - to_vals[-2]) / abs(to_vals[-2]) * 100)
-
-        # ── Employees trajectory ──
-        emp_series = years_data["employees"].dropna()
-        if len(emp_series) >= 2:
-            emp_vals = emp_series.values
-            row["emp_declining"] = int(emp_vals[-1] < emp_vals[-2])
-
-        features.append(row)
-
-    print(f"  Computed features for {len(features):,} companies")
-    fin_df = pd.DataFrame(features)
+    is_last = ~accts["co_key"].duplicated(keep="last")
+    latest = accts[is_last].set_index("co_key")
+    cols = {}
+
+    # ── Latest values ──
+    cols["company_number"] = pd.Series(_company_number(latest.index), index=latest.index)
+    cols["fin_years_available"] = accts.groupby("co_key", sort=False).size()
+    cols["latest_year"] = latest["year"].astype(int)
+    for field in LATEST_FIELDS:
+        cols[f"fin_{field}"] = latest[field].astype(float)
+
+    # ── Net assets trajectory ──
+    na = _field_history(accts, "net_assets")
+    na = na[na["count"] >= 2]
+    cols["na_latest_change"] = na["change"]
+    cols["na_avg_change"] = (na["last"] - na["first"]) / (na["count"] - 1)
+    cols["na_declining"] = (na["change"] < 0).astype(int)
+    cols["na_years_declining"] = na["decline_run"]
+    # Rate of change (percentage) — avoid division by tiny numbers
+    cols["na_pct_change"] = _pct_change(na).fillna(0.0)
+    # Acceleration: is decline getting worse?
+    acc = na[na["count"] >= 3]
+    cols["na_accelerating"] = (acc["change"] < acc["prev_change"]).astype(int)
+    # Has equity turned negative?
+    cols["na_negative"] = (na["last"] < 0).astype(int)
+    cols["na_was_positive_now_negative"] = ((na["last"] < 0) & (na["first"] > 0)).astype(int)
+
+    # ── Current ratio (latest + per-year trend) ──
+    latest_cl = latest["current_liabilities"].abs()
+    cols["fin_current_ratio"] = (latest["current_assets"] / latest_cl).where(latest_cl > 0)
+
+    cl_abs = accts["current_liabilities"].abs()
+    accts["_current_ratio"] = (accts["current_assets"] / cl_abs).where(cl_abs > 0)
+    cr = _field_history(accts, "_current_ratio")
+    cr = cr[cr["count"] >= 2]
+    cols["cr_trend"] = cr["change"]
+    cols["cr_declining"] = (cr["change"] < 0).astype(int)
+
+    # ── Cash position ──
+    cols["fin_cash_ratio"] = (latest["cash"] / latest_cl).where(latest_cl > 0)
+
+    # ── Leverage ratio ──
+    latest_ta = latest["total_assets"].abs()
+    cols["fin_leverage"] = (latest["total_liabilities"].abs() / latest_ta).where(latest_ta > 0)
+
+    # ── Asset shrinkage ──
+    ta = _field_history(accts, "total_assets")
+    ta = ta[ta["count"] >= 2]
+    cols["ta_shrinking"] = (ta["change"] < 0).astype(int)
+    cols["ta_pct_change"] = _pct_change(ta)
+
+    # ── Retained earnings trajectory ──
+    re_ = _field_history(accts, "retained_earnings")
+    re_ = re_[re_["count"] >= 2]
+    cols["re_declining"] = (re_["change"] < 0).astype(int)
+    cols["re_negative"] = (re_["last"] < 0).astype(int)
+
+    # ── Turnover trajectory (if available — small/full accounts) ──
+    to = _field_history(accts, "turnover")
+    to = to[to["count"] >= 2]
+    cols["to_declining"] = (to["change"] < 0).astype(int)
+    cols["to_pct_change"] = _pct_change(to)
+
+    # ── Employees trajectory ──
+    emp = _field_history(accts, "employees")
+    emp = emp[emp["count"] >= 2]
+    cols["emp_declining"] = (emp["change"] < 0).astype(int)
+
+    # Assemble column-wise; companies missing from a sparse feature get NaN
+    fin_df = pd.DataFrame(cols, index=latest.index)
+    fin_df[FIN_FLOAT32_COLS] = fin_df[FIN_FLOAT32_COLS].astype("float32")
+    fin_df.index.name = "co_key"
+    fin_df = fin_df.reset_index()
+    fin_df.insert(0, "company_number", fin_df.pop("company_number"))
+    print(f"  Computed features for {len(fin_df):,} companies")
 
     # Summary
     print(f"\n[3.3] Financial feature summary:")
@@ -366,9 +501,14 @@ def build_training_data(profile_csv, accounts_parquet, output_path):
     # Load and compute financial features
     fin_features = build_financial_features(accounts_parquet)
 
-    # Join on company_number
+    # company_status is only used to derive `failed` — drop before the join
+    profiles = profiles.drop(columns=["company_status"])
+
+    # Join on the packed integer key rather than hashing 8-char strings
     print(f"\n[3.4] Joining profile ({len(profiles):,}) with financials ({len(fin_features):,})...")
-    merged = profiles.merge(fin_features, on="company_number", how="left")
+    # INVALID_KEY profiles find nothing: those accounts rows were dropped above
+    merged = profiles.merge(fin_features.drop(columns=["company_number"]),
+                            on="co_key", how="left")
 
     # Stats on join
     has_fin = merged["fin_net_assets"].notna().sum()
@@ -378,26 +518,28 @@ def build_training_data(profile_csv, accounts_parquet, output_path):
 
     # Fill NaN financial features with sentinel values
     # The model will learn that NaN (= no accounts data) is itself informative
+    # Use -999 as sentinel for "no data" — model can learn this
     fin_cols = [c for c in merged.columns if c.startswith(("fin_", "na_", "cr_", "ta_", "re_", "to_", "emp_"))]
-    for col in fin_cols:
-        if merged[col].dtype in ["float64", "float32", "int64"]:
-            # Use -999 as sentinel for "no data" — model can learn this
-            merged[col] = merged[col].fillna(-999)
+    fill_map = {c: -999 for c in fin_cols if merged[c].dtype in ["float64", "float32", "int64"]}
 
-    # Boolean flags: NaN → 0
+    # Boolean flags: NaN → 0 (flags that already got the -999 sentinel keep it,
+    # so they're int16 rather than int8)
     bool_cols = [c for c in merged.columns if c.endswith(("_declining", "_negative", "_accelerating", "_shrinking"))]
     for col in bool_cols:
-        merged[col] = merged[col].fillna(0).astype(int)
+        fill_map.setdefault(col, 0)
+
+    # One fillna/astype pass instead of a column-at-a-time loop
+    merged = merged.fillna(fill_map).astype({c: "int16" for c in bool_cols})
 
     # Add has_accounts flag
-    merged["has_accounts_data"] = (merged["fin_net_assets"] != -999).astype(int)
-    merged["has_trajectory"] = (merged["na_latest_change"] != -999).astype(int)
+    merged["has_accounts_data"] = (merged["fin_net_assets"].to_numpy() != -999).astype(np.int8)
+    merged["has_trajectory"] = (merged["na_latest_change"].to_numpy() != -999).astype(np.int8)
 
     # Drop non-feature columns
-    merged = merged.drop(columns=["company_number", "company_status"], errors="ignore")
+    merged = merged.drop(columns=["company_number", "co_key"], errors="ignore")
 
     # Fill any remaining NaN
-    merged = merged.fillna(0)
+    merged.fillna(0, inplace=True)
 
     print(f"\n[3.5] Final training dataset:")
     print(f"  Total companies: {len(merged):,}")
@@ -408,7 +550,12 @@ def build_training_data(profile_csv, accounts_parquet, output_path):
 
     # Save
     print(f"\n[3.6] Saving to {output_path}...")
-    merged.to_parquet(output_path, index=False)
+    # Mostly low-cardinality ints and -999 sentinels — dictionary + zstd
+    # encodes them far smaller than the snappy/plain defaults
+    merged.to_parquet(output_path, index=False, engine="pyarrow",
+                      compression="zstd", compression_level=3,
+                      use_dictionary=True, row_group_size=262144,
+                      data_page_size=1 << 20)
     size_mb = os.path.getsize(output_path) / 1024 / 1024
     print(f"  [ok] Saved ({size_mb:.1f} MB)")
 
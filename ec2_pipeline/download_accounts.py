@@ -15,7 +15,12 @@ import re
 import sys
 import time
 import zipfile
+import queue
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta
 from tqdm import tqdm
 
@@ -31,6 +36,21 @@ MONTHLY_INDEX = f"{BASE_URL}/en_monthlyaccountsdata.html"
 HISTORIC_INDEX = f"{BASE_URL}/historicmonthlyaccountsdata.html"
 DAILY_INDEX = f"{BASE_URL}/en_accountsdata.html"
 
+# Parallel range downloads — CH throttles per connection, so large zips are
+# fetched as this many concurrent byte ranges when the server allows it
+RANGE_CONNECTIONS = 8
+RANGE_MIN_SIZE = 64 * 1024 * 1024
+
+# One pooled session for every CH request — keeps connections alive and
+# backs off on throttling / transient server errors
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=RANGE_CONNECTIONS,
+    max_retries=Retry(total=3, backoff_factor=2, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("HEAD", "GET")),
+))
+_session.mount("https://", _session.get_adapter("http://"))
+
 
 def get_available_zips():
     """Scrape CH download pages for available accounts zip URLs.
@@ -42,7 +62,7 @@ def get_available_zips():
 
     for label, url in [("monthly", MONTHLY_INDEX), ("historic", HISTORIC_INDEX)]:
         try:
-            resp = requests.get(url, timeout=30)
+            resp = _session.get(url, timeout=30)
             resp.raise_for_status()
             # Parse zip links — typical: Accounts_Monthly_Data-YYYY-MM.zip
             pattern = re.compile(r'href=["\']([^"\']*\.zip)["\']', re.I)
@@ -77,42 +97,98 @@ def generate_fallback_urls():
     return urls
 
 
+def _download_ranges(url, dest_path, total):
+    """Fetch `url` as RANGE_CONNECTIONS parallel byte ranges into dest_path.
+
+    Writes to a .part file that is only renamed once every range has landed,
+    so a pre-sized but incomplete file never looks like a finished download.
+    """
+    part_path = dest_path + ".part"
+    # Pre-size the file so each range can be written at its own offset
+    with open(part_path, "wb") as f:
+        f.truncate(total)
+
+    span = -(-total // RANGE_CONNECTIONS)
+    ranges = [(start, min(start + span, total) - 1) for start in range(0, total, span)]
+    lock = threading.Lock()
+    fd = os.open(part_path, os.O_WRONLY)
+
+    def fetch(byte_range):
+        start, end = byte_range
+        resp = _session.get(url, headers={"Range": f"bytes={start}-{end}"},
+                            stream=True, timeout=30)
+        resp.raise_for_status()
+        if resp.status_code != 206:
+            raise IOError("server ignored Range header")
+        offset = start
+        for chunk in resp.iter_content(chunk_size=1024 * 1024):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+            with lock:
+                pbar.update(len(chunk))
+        if offset != end + 1:
+            raise IOError(f"short read for bytes {start}-{end}")
+
+    try:
+        with tqdm(total=total, unit="B", unit_scale=True,
+                  desc=f"  {os.path.basename(dest_path)}", ncols=80) as pbar:
+            with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+                list(pool.map(fetch, ranges))  # re-raises the first failure
+    except BaseException:
+        os.close(fd)
+        os.remove(part_path)
+        raise
+    os.close(fd)
+    os.replace(part_path, dest_path)
+
+
 def download_file(url, dest_path):
-    """Download a file with progress bar and resume support."""
-    # Check if already downloaded
-    if os.path.exists(dest_path):
-        local_size = os.path.getsize(dest_path)
-        # Check remote size
-        try:
-            head = requests.head(url, timeout=10)
-            remote_size = int(head.headers.get("content-length", 0))
-            if remote_size > 0 and local_size >= remote_size:
-                print(f"  [skip] Already downloaded: {os.path.basename(dest_path)}")
-                return True
-        except:
-            pass
+    """Download a file with progress bar and resume support.
+
+    A single GET does the work: an existing partial file is resumed with a
+    Range request (416 means it's already complete), and a fresh download of
+    a large file switches to parallel range requests when the server
+    advertises Accept-Ranges.
+    """
+    local_size = os.path.getsize(dest_path) if os.path.exists(dest_path) else 0
+    headers = {"Range": f"bytes={local_size}-"} if local_size else {}
+    filename = os.path.basename(dest_path)
 
     try:
-        resp = requests.get(url, stream=True, timeout=30)
+        resp = _session.get(url, stream=True, headers=headers, timeout=30)
+        if resp.status_code == 416:
+            resp.close()
+            print(f"  [skip] Already downloaded: {filename}")
+            return True
         if resp.status_code == 404:
             return False
         resp.raise_for_status()
 
-        total = int(resp.headers.get("content-length", 0))
-        filename = os.path.basename(dest_path)
+        if resp.status_code == 206:
+            # Content-Range: bytes <start>-<end>/<total>
+            total = resp.headers.get("content-range", "").rpartition("/")[2]
+            total = int(total) if total.isdigit() else 0
+            mode, done = "ab", local_size
+        else:
+            total = int(resp.headers.get("content-length", 0))
+            mode, done = "wb", 0
+            accepts_ranges = resp.headers.get("accept-ranges", "").lower() == "bytes"
+            if accepts_ranges and total >= RANGE_MIN_SIZE:
+                resp.close()
+                _download_ranges(url, dest_path, total)
+                return True
 
-        with open(dest_path, "wb") as f:
-            with tqdm(total=total, unit="B", unit_scale=True, desc=f"  {filename}",
-                      ncols=80) as pbar:
+        with open(dest_path, mode) as f:
+            with tqdm(total=total, initial=done, unit="B", unit_scale=True,
+                      desc=f"  {filename}", ncols=80) as pbar:
                 for chunk in resp.iter_content(chunk_size=1024 * 1024):  # 1MB chunks
                     f.write(chunk)
                     pbar.update(len(chunk))
         return True
 
     except Exception as e:
+        # Keep whatever arrived — the next run resumes from it
         print(f"  [!!] Download failed: {e}")
-        if os.path.exists(dest_path):
-            os.remove(dest_path)
         return False
 
 
@@ -131,17 +207,46 @@ def extract_zip(zip_path, extract_dir):
     try:
         with zipfile.ZipFile(zip_path, "r") as zf:
             members = zf.namelist()
-            for member in tqdm(members, desc=f"  {basename}", ncols=80, unit="files"):
-                try:
-                    zf.extract(member, target_dir)
-                except (zipfile.BadZipFile, KeyError, OSError):
-                    continue
-        print(f"  [ok] {len(members):,} files extracted to {basename}")
-        return target_dir
     except zipfile.BadZipFile:
         print(f"  [!!] Corrupt zip: {zip_path}")
         return None
 
+    # Members are independent DEFLATE streams, so inflate them across threads
+    # (zlib releases the GIL). ZipFile handles aren't safe to share between
+    # threads, so each worker opens its own.
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+
+    def extract_one(member):
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            zf = local.zf = zipfile.ZipFile(zip_path, "r")
+            with handles_lock:
+                handles.append(zf)
+        try:
+            zf.extract(member, target_dir)
+        except FileExistsError:
+            # Another thread created the same parent directory first
+            try:
+                zf.extract(member, target_dir)
+            except (zipfile.BadZipFile, KeyError, OSError):
+                pass
+        except (zipfile.BadZipFile, KeyError, OSError):
+            pass
+
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as pool:
+            for _ in tqdm(pool.map(extract_one, members), total=len(members),
+                          desc=f"  {basename}", ncols=80, unit="files"):
+                pass
+    finally:
+        for zf in handles:
+            zf.close()
+
+    print(f"  [ok] {len(members):,} files extracted to {basename}")
+    return target_dir
+
 
 def download_bulk_accounts(output_dir, months=24):
     """Download and extract bulk accounts data.
@@ -160,29 +265,41 @@ def download_bulk_accounts(output_dir, months=24):
 
     available = get_available_zips()
 
-    downloaded = 0
-    for url in available[:months]:
-        filename = os.path.basename(url)
-        zip_path = os.path.join(zip_dir, filename)
+    # Download and extraction use different resources (network vs CPU), so
+    # a downloader thread fetches the next zip while this thread extracts
+    # the previous one. The small queue bounds how far downloads run ahead.
+    ready = queue.Queue(maxsize=2)
 
-        print(f"\n[{downloaded + 1}/{months}] {filename}")
+    def downloader():
+        try:
+            for i, url in enumerate(available[:months]):
+                filename = os.path.basename(url)
+                zip_path = os.path.join(zip_dir, filename)
 
-        # Download
-        if download_file(url, zip_path):
-            # Extract
-            extract_zip(zip_path, output_dir)
-            downloaded += 1
+                print(f"\n[{i + 1}/{months}] {filename}")
 
-            # Optionally delete zip after extraction to save space
-            # os.remove(zip_path)
-        else:
-            print(f"  [skip] Not available: {filename}")
+                if download_file(url, zip_path):
+                    ready.put(zip_path)
+                else:
+                    print(f"  [skip] Not available: {filename}")
 
-        if downloaded >= months:
+                # Be polite to CH servers
+                time.sleep(2)
+        finally:
+            ready.put(None)
+
+    threading.Thread(target=downloader, daemon=True).start()
+
+    downloaded = 0
+    while True:
+        zip_path = ready.get()
+        if zip_path is None:
             break
+        extract_zip(zip_path, output_dir)
+        downloaded += 1
 
-        # Be polite to CH servers
-        time.sleep(2)
+        # Optionally delete zip after extraction to save space
+        # os.remove(zip_path)
 
     print(f"\n[ok] Downloaded and extracted {downloaded} months of accounts data")
     print(f"     Location: {output_dir}")
@@ -29,15 +29,19 @@ import sys
 import glob
 import json
 import time
+import uuid
+import shutil
 import traceback
 import warnings
-from datetime import datetime
+from datetime import date
 from multiprocessing import Pool, cpu_count
 from functools import partial
 
 import numpy as np
 import pandas as pd
-from bs4 import BeautifulSoup
+import pyarrow as pa
+import pyarrow.parquet as pq
+from lxml import etree
 from tqdm import tqdm
 
 warnings.filterwarnings("ignore")
@@ -107,47 +111,91 @@ for field, concepts in CONCEPT_MAP.items():
         _CONCEPT_LOOKUP[c.lower()] = field
 
 
+# Raw `name` attribute → field (or None). Filings reuse a small taxonomy, so
+# this stays small while sparing a split + lower() per fact
+_FIELD_CACHE = {}
+
+# Row layout written by the parse loop — period_end arrives already parsed
+RAW_SCHEMA = pa.schema(
+    [("company_number", pa.string()), ("period_end", pa.date32())]
+    + [(field, pa.float64()) for field in CONCEPT_MAP]
+)
+
+# Parquet layout for the stage-2 output. Monetary fields stay float64 (float32
+# only holds ~7 significant digits); headcounts and year are narrowed.
+OUTPUT_DTYPES = {"year": "int16", "employees": "float32"}
+OUTPUT_PARQUET_OPTIONS = dict(
+    compression="zstd",
+    use_dictionary=True,
+    write_statistics=True,
+    row_group_size=256_000,
+)
+
+# Concept suffixes as lower-case bytes, grouped by field — used to skip files
+# that can't yield a usable row before handing them to the XML parser
+_FIELD_CONCEPT_BYTES = {}
+for c, field in _CONCEPT_LOOKUP.items():
+    _FIELD_CONCEPT_BYTES.setdefault(field, []).append(c.encode())
+
+
+def _has_min_fields(content, min_fields=2):
+    """True if the raw bytes mention concepts for at least `min_fields` fields.
+
+    Plain substring search over the lower-cased bytes — it can over-count
+    (e.g. "profitloss" inside "profitlossaccountreserve") but never misses a
+    concept that the parser would match, so it only ever skips dead files.
+    """
+    low = content.lower()
+    found = 0
+    for concepts in _FIELD_CONCEPT_BYTES.values():
+        if any(c in low for c in concepts):
+            found += 1
+            if found >= min_fields:
+                return True
+    return False
+
+
 # ═══════════════════════════════════════════════════════════
 #  iXBRL Parser — Lightweight & Fast
 # ═══════════════════════════════════════════════════════════
 
+# Company-number patterns, precompiled on bytes so the file head never needs
+# decoding. Filename patterns are tried first, then content patterns in
+# priority order (entity identifier last).
+_CN_FILENAME_RES = (re.compile(rb"_(\d{8})_"), re.compile(rb"(\d{8})"))
+_CN_CONTENT_RES = (
+    re.compile(rb"CompanyNumber[>\s:]+(\d{6,8})", re.I),
+    re.compile(rb"RegisteredNumber[>\s:]+(\d{6,8})", re.I),
+    re.compile(rb"<[^>]*identifier[^>]*>(\d{6,8})<", re.I),
+)
+
+
 def extract_company_number(filepath, content_head):
-    """Extract company number from filename or file content."""
-    # Try filename first — CH bulk files often named like: Prod224_1234_00012345_20240331.html
-    basename = os.path.basename(filepath)
-    # Match 8-digit company number pattern
-    m = re.search(r"_(\d{8})_", basename)
-    if m:
-        return m.group(1)
-
-    # Also try: CompanyNumber_12345678 in filename
-    m = re.search(r"(\d{8})", basename)
-    if m:
-        return m.group(1)
-
-    # Try content — look for company number in XBRL entity identifier
-    m = re.search(r"CompanyNumber[>\s:]+(\d{6,8})", content_head, re.I)
-    if m:
-        return m.group(1).zfill(8)
-
-    # Try UKCompaniesHouseRegisteredNumber or similar
-    m = re.search(r"RegisteredNumber[>\s:]+(\d{6,8})", content_head, re.I)
-    if m:
-        return m.group(1).zfill(8)
-
-    # Look in entity identifier tags
-    m = re.search(r'<[^>]*identifier[^>]*>(\d{6,8})<', content_head, re.I)
-    if m:
-        return m.group(1).zfill(8)
+    """Extract company number from filename or file content (head as bytes)."""
+    # CH bulk files are named like: Prod224_1234_00012345_20240331.html
+    basename = os.fsencode(os.path.basename(filepath))
+    for pattern in _CN_FILENAME_RES:
+        m = pattern.search(basename)
+        if m:
+            return m.group(1).decode()
+
+    # Fall back to XBRL entity identifiers in the document head
+    for pattern in _CN_CONTENT_RES:
+        m = pattern.search(content_head)
+        if m:
+            return m.group(1).decode().zfill(8)
 
     return None
 
 
+# Everything that isn't part of a number (also covers ",", " " and "\xa0")
+_NON_NUMERIC_RE = re.compile(r"[^\d.\-]")
+
+
 def parse_value(text, scale_str="0", sign=""):
     """Parse a numeric value from iXBRL text."""
-    cleaned = text.replace(",", "").replace(" ", "").replace("\xa0", "")
     has_brackets = "(" in text and ")" in text
-    cleaned = re.sub(r"[^\d.\-]", "", cleaned)
+    cleaned = _NON_NUMERIC_RE.sub("", text)
 
     if not cleaned or cleaned in (".", "-"):
         return None
@@ -158,12 +206,13 @@ def parse_value(text, scale_str="0", sign=""):
         return None
 
     # Apply scale (e.g., scale="3" means thousands, "6" means millions)
-    try:
-        scale = int(scale_str)
-        if scale != 0:
-            val *= 10 ** scale
-    except (ValueError, TypeError):
-        pass
+    if scale_str != "0":
+        try:
+            scale = int(scale_str)
+            if scale != 0:
+                val *= 10 ** scale
+        except (ValueError, TypeError):
+            pass
 
     # Apply sign
     if sign == "-" or has_brackets:
@@ -172,21 +221,111 @@ def parse_value(text, scale_str="0", sign=""):
     return val
 
 
+def _local(tag):
+    """Lower-cased local name of an lxml tag ("{ns}nonFraction" → "nonfraction")."""
+    if not isinstance(tag, str):
+        return ""  # comments / processing instructions
+    return tag.rsplit("}", 1)[-1].lower()
+
+
+def _find_local(elem, suffix):
+    """First descendant whose local name ends with `suffix`."""
+    for el in elem.iterdescendants():
+        if _local(el.tag).endswith(suffix):
+            return el
+    return None
+
+
+def _text(elem):
+    """Stripped text of an element and its descendants, joined."""
+    return "".join(t.strip() for t in elem.itertext())
+
+
+def _parse_context(ctx):
+    """Return {"date": date, ["has_dimension": True]} for an xbrli:context, or None.
+
+    Contexts whose period date isn't valid ISO-8601 are dropped here, so rows
+    leave the worker with a typed date and the parent never re-parses strings.
+    """
+    period = _find_local(ctx, "period")
+    if period is None:
+        return None
+
+    instant = _find_local(period, "instant")
+    end = _find_local(period, "enddate")
+    node = instant if instant is not None else end
+    if node is None:
+        return None
+    try:
+        info = {"date": date.fromisoformat(_text(node)[:10])}
+    except ValueError:
+        return None
+
+    # Skip contexts with dimensions (consolidated, segment etc)
+    segment = _find_local(ctx, "segment")
+    if segment is not None and any(
+        "explicitmember" in _local(el.tag) or "typedmember" in _local(el.tag)
+        for el in segment.iterdescendants()
+    ):
+        info["has_dimension"] = True
+    return info
+
+
+# Per-process pull parser, built once by _init_worker and reused for every file
+_PARSER = None
+_FEED_CHUNK = 1 << 16
+
+
+def _init_worker():
+    """Pool initializer — build this process's reusable lxml pull parser."""
+    global _PARSER
+    _PARSER = etree.XMLPullParser(
+        events=("end",), tag=("{*}context", "{*}nonFraction"),
+        recover=True, huge_tree=True, remove_comments=True,
+    )
+
+
+def _iter_facts(content):
+    """Yield context/nonFraction elements from `content` via the shared parser."""
+    if _PARSER is None:
+        _init_worker()
+    closed = False
+    try:
+        for start in range(0, len(content), _FEED_CHUNK):
+            _PARSER.feed(content[start:start + _FEED_CHUNK])
+            for _, elem in _PARSER.read_events():
+                yield elem
+        closed = True
+        try:
+            _PARSER.close()
+        except etree.LxmlError:
+            pass
+        for _, elem in _PARSER.read_events():
+            yield elem
+    finally:
+        # Reset the parser for the next file, even if this one was abandoned
+        if not closed:
+            try:
+                _PARSER.close()
+            except etree.LxmlError:
+                pass
+        for _ in _PARSER.read_events():
+            pass
+
+
 def parse_ixbrl_fast(filepath):
     """Fast iXBRL parser optimised for bulk processing.
 
+    Streams the file through the worker's reusable lxml pull parser, only
+    materialising the context and nonFraction elements — no full soup tree,
+    no regex tag scans.
+
     Returns list of dicts: [{company_number, period_end, field: value, ...}]
     One dict per reporting period found in the file.
     """
     try:
-        # Read file
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(filepath, "r", encoding="latin-1") as f:
-                content = f.read()
-
+        with open(filepath, "rb") as f:
+            content = f.read()
         if len(content) < 200:
             return []
 
@@ -195,76 +334,68 @@ def parse_ixbrl_fast(filepath):
         if not company_number:
             return []
 
-        # Use BeautifulSoup for robust parsing
-        soup = BeautifulSoup(content, "lxml")
+        # A kept period needs 2+ fields, so a file naming fewer distinct
+        # concepts can't produce a row — skip the XML parse entirely
+        if not _has_min_fields(content):
+            return []
 
-        # ── Parse contexts (period definitions) ──
+        # ── Single streaming pass: contexts + candidate facts ──
+        # Facts may appear before their contexts, so resolve them afterwards.
         contexts = {}
-        for ctx in soup.find_all(re.compile(r"context$", re.I)):
-            ctx_id = ctx.get("id")
-            if not ctx_id:
-                continue
-
-            period = ctx.find(re.compile(r"period$", re.I))
-            if not period:
-                continue
-
-            info = {}
-            instant = period.find(re.compile(r"instant$", re.I))
-            end = period.find(re.compile(r"enddate$", re.I))
-
-            if instant:
-                info["date"] = instant.get_text(strip=True)[:10]
-            elif end:
-                info["date"] = end.get_text(strip=True)[:10]
-            else:
+        facts = []  # (field, ctx_ref, text, sign, scale)
+
+        for elem in _iter_facts(content):
+            if _local(elem.tag) == "context":
+                ctx_id = elem.get("id")
+                if ctx_id:
+                    info = _parse_context(elem)
+                    if info is not None:
+                        contexts[ctx_id] = info
+                elem.clear(keep_tail=True)
                 continue
 
-            # Skip contexts with dimensions (consolidated, segment etc)
-            segment = ctx.find(re.compile(r"segment$", re.I))
-            if segment and segment.find(re.compile(r"explicitmember|typedmember", re.I)):
-                info["has_dimension"] = True
-
-            contexts[ctx_id] = info
+            name = elem.get("name", "")
+            # Concept name → field, memoised (misses cached as None)
+            try:
+                field = _FIELD_CACHE[name]
+            except KeyError:
+                field = _FIELD_CACHE[name] = _CONCEPT_LOOKUP.get(
+                    name.rpartition(":")[2].lower())
+            if field:
+                ctx_ref = elem.get("contextRef") or elem.get("contextref", "")
+                facts.append((field, ctx_ref, _text(elem),
+                              elem.get("sign", ""), elem.get("scale", "0")))
+            # Nested facts still need their text for the enclosing fact
+            parent = elem.getparent()
+            if parent is None or _local(parent.tag) != "nonfraction":
+                elem.clear(keep_tail=True)
 
         if not contexts:
             return []
 
-        # ── Parse facts ──
+        # ── Resolve facts ──
         # Collect all values by (context_date, field)
         by_period = {}  # date → {field: value}
 
-        for tag in soup.find_all(re.compile(r"nonfraction$", re.I)):
-            name = tag.get("name", "")
-            ctx_ref = tag.get("contextref") or tag.get("contextRef", "")
-
-            # Get local concept name
-            local_name = name.split(":")[-1] if ":" in name else name
-            field = _CONCEPT_LOOKUP.get(local_name.lower())
-            if not field:
-                continue
-
+        for field, ctx_ref, text, sign, scale in facts:
             # Resolve context
             ctx = contexts.get(ctx_ref)
             if not ctx or ctx.get("has_dimension"):
                 continue
 
-            date = ctx["date"]
+            period_end = ctx["date"]
 
             # Parse value
-            text = tag.get_text(strip=True)
-            sign = tag.get("sign", "")
-            scale = tag.get("scale", "0")
             val = parse_value(text, scale, sign)
             if val is None:
                 continue
 
-            if date not in by_period:
-                by_period[date] = {"company_number": company_number, "period_end": date}
+            if period_end not in by_period:
+                by_period[period_end] = {"company_number": company_number, "period_end": period_end}
 
             # Only keep first value for each field per period (avoid double-counting)
-            if field not in by_period[date]:
-                by_period[date][field] = val
+            if field not in by_period[period_end]:
+                by_period[period_end][field] = val
 
         results = list(by_period.values())
 
@@ -281,33 +412,68 @@ def parse_ixbrl_fast(filepath):
 #  Bulk Processing
 # ═══════════════════════════════════════════════════════════
 
-def find_all_account_files(base_dir):
-    """Recursively find all iXBRL/HTML/XML account files."""
+def find_all_account_files(base_dir, min_size=500):
+    """Recursively find all iXBRL/HTML/XML account files.
+
+    Returns (path, size, mtime) tuples. Files of `min_size` bytes or less
+    (readmes, indexes, etc) are skipped.
+    Uses os.scandir so the file type comes from the directory read and the
+    size check costs a single stat per candidate.
+    """
     extensions = (".html", ".htm", ".xml", ".xhtml")
     files = []
-    for root, dirs, filenames in os.walk(base_dir):
-        for fname in filenames:
-            if fname.lower().endswith(extensions):
-                files.append(os.path.join(root, fname))
+    stack = [base_dir]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(extensions):
+                    st = entry.stat()
+                    if st.st_size > min_size:
+                        files.append((entry.path, st.st_size, st.st_mtime))
     return files
 
 
-def process_batch(file_batch):
-    """Process a batch of files (for multiprocessing)."""
+def process_batch(file_batch, out_dir):
+    """Process a batch of files (for multiprocessing).
+
+    Rows are written to a Parquet shard in `out_dir` by the worker itself, so
+    only the row count crosses the process boundary — not every row dict.
+    """
     results = []
     for filepath in file_batch:
         rows = parse_ixbrl_fast(filepath)
         results.extend(rows)
-    return results
+    if results:
+        shard = os.path.join(out_dir, f"part-{os.getpid()}-{uuid.uuid4().hex}.parquet")
+        pq.write_table(pa.Table.from_pylist(results, schema=RAW_SCHEMA), shard,
+                       compression="zstd")
+    return len(results)
 
 
-def parse_all_accounts(accounts_dir, output_parquet, workers=8):
+def _run_batch(job):
+    """imap adaptor — `job` is (file_batch, out_dir)."""
+    return process_batch(*job)
+
+
+def _source_group(path, accounts_dir):
+    """Top-level extraction directory (one per monthly zip) holding `path`."""
+    rel = os.path.relpath(path, accounts_dir)
+    head, sep, _ = rel.partition(os.sep)
+    return head if sep else "_root"
+
+
+def parse_all_accounts(accounts_dir, output_parquet, workers=8, reuse_shards=True):
     """Parse all iXBRL files into a single Parquet dataset.
 
     Args:
         accounts_dir: Directory containing extracted accounts folders
         output_parquet: Output Parquet file path
         workers: Number of parallel worker processes
+        reuse_shards: Keep the cached shards of any extraction directory that
+            hasn't changed since it was last parsed (monthly zips are
+            immutable, so a re-run only parses the new months)
     """
     print(f"\n[Stage 2] Parsing iXBRL accounts")
     print(f"  Source: {accounts_dir}")
@@ -316,8 +482,8 @@ def parse_all_accounts(accounts_dir, output_parquet, workers=8):
 
     # Check if already parsed
     if os.path.exists(output_parquet):
-        existing = pd.read_parquet(output_parquet)
-        print(f"  [exists] {len(existing):,} rows already parsed")
+        existing_rows = pq.ParquetFile(output_parquet).metadata.num_rows
+        print(f"  [exists] {existing_rows:,} rows already parsed")
         resp = input("  Re-parse? (y/N): ").strip().lower()
         if resp != "y":
             return
@@ -325,64 +491,92 @@ def parse_all_accounts(accounts_dir, output_parquet, workers=8):
     # Find all files
     print("\n[2.1] Scanning for account files...")
     all_files = find_all_account_files(accounts_dir)
-    # Filter out non-account files (readmes, indexes, etc)
-    all_files = [f for f in all_files if os.path.getsize(f) > 500]
     print(f"  Found {len(all_files):,} files to parse")
 
     if not all_files:
         print("[!!] No account files found. Check that Stage 1 completed.")
         return
 
-    # Split into batches for multiprocessing
-    batch_size = 500
-    batches = [all_files[i:i + batch_size] for i in range(0, len(all_files), batch_size)]
-    print(f"  Split into {len(batches)} batches of ~{batch_size} files")
-
-    # Process with multiprocessing
+    # Parsed rows are cached per extraction directory (one per monthly zip)
+    # under shards/<dir>/. A directory whose _SUCCESS marker is newer than
+    # every file in it is reused as-is; everything else is re-parsed.
+    shards_root = os.path.join(os.path.dirname(os.path.abspath(output_parquet)), "shards")
+    groups = {}
+    for f in all_files:
+        groups.setdefault(_source_group(f[0], accounts_dir), []).append(f)
+
+    cached, stale = [], {}
+    for group, files in groups.items():
+        marker = os.path.join(shards_root, group, "_SUCCESS")
+        newest = max(mtime for _, _, mtime in files)
+        if reuse_shards and os.path.exists(marker) and os.path.getmtime(marker) >= newest:
+            cached.append(group)
+        else:
+            stale[group] = files
+    print(f"  {len(cached)} directories cached, {len(stale)} to parse")
+
+    # Split into batches for multiprocessing. File sizes vary ~100x (dormant
+    # vs full accounts), so deal largest-first round-robin — every batch gets
+    # a similar mix and no single batch becomes the straggler. Batches never
+    # span directories, so each one lands in its directory's shard cache.
+    batch_size = 100
+    jobs = []
+    for group, files in stale.items():
+        group_dir = os.path.join(shards_root, group)
+        shutil.rmtree(group_dir, ignore_errors=True)
+        os.makedirs(group_dir)
+        files.sort(key=lambda f: f[1], reverse=True)
+        num_batches = -(-len(files) // batch_size)
+        batches = [[] for _ in range(num_batches)]
+        for i, (path, _, _) in enumerate(files):
+            batches[i % num_batches].append(path)
+        jobs.extend((batch, group_dir) for batch in batches)
+    parse_files = sum(len(files) for files in stale.values())
+    print(f"  Split into {len(jobs)} batches of ~{batch_size} files")
+
+    # Process with multiprocessing. Each worker writes its batch to a Parquet
+    # shard and only returns a row count, so nothing is pickled back.
     print(f"\n[2.2] Parsing with {workers} workers...")
-    all_rows = []
-    parsed_count = 0
+    rows_extracted = 0
     failed_count = 0
     t0 = time.time()
 
-    with Pool(workers) as pool:
-        for batch_results in tqdm(
-            pool.imap_unordered(process_batch, batches),
-            total=len(batches),
-            desc="  Parsing",
-            ncols=80,
-            unit="batch",
-        ):
-            all_rows.extend(batch_results)
-            parsed_count += batch_size
-
-            # Progress update every 50 batches
-            if len(all_rows) % 25000 == 0 and all_rows:
-                elapsed = time.time() - t0
-                rate = parsed_count / elapsed
-                remaining = (len(all_files) - parsed_count) / max(rate, 1)
-                print(f"    {len(all_rows):,} rows extracted | "
-                      f"{rate:.0f} files/sec | "
-                      f"~{remaining / 60:.0f} min remaining")
+    # tqdm already reports rate and ETA; the running row count rides along in
+    # its postfix rather than in extra prints from this loop
+    with Pool(workers, initializer=_init_worker) as pool, tqdm(
+        total=len(jobs), desc="  Parsing", ncols=80, unit="batch"
+    ) as pbar:
+        for batch_rows in pool.imap_unordered(_run_batch, jobs):
+            rows_extracted += batch_rows
+            pbar.set_postfix(rows=rows_extracted, refresh=False)
+            pbar.update()
+
+    # Every batch finished — mark the freshly parsed directories as complete
+    for group in stale:
+        open(os.path.join(shards_root, group, "_SUCCESS"), "w").close()
 
     elapsed = time.time() - t0
     print(f"\n[2.3] Parsing complete")
-    print(f"  Files processed: {len(all_files):,}")
-    print(f"  Rows extracted: {len(all_rows):,}")
-    print(f"  Time: {elapsed / 60:.1f} minutes ({len(all_files) / elapsed:.0f} files/sec)")
-
-    if not all_rows:
+    print(f"  Files processed: {parse_files:,}")
+    print(f"  Rows extracted: {rows_extracted:,}")
+    print(f"  Time: {elapsed / 60:.1f} minutes ({parse_files / max(elapsed, 1e-9):.0f} files/sec)")
+
+    shard_files = sorted(
+        entry.path
+        for group in groups
+        for entry in os.scandir(os.path.join(shards_root, group))
+        if entry.name.endswith(".parquet")
+    )
+    if not shard_files:
         print("[!!] No data extracted. Check file formats.")
         return
 
-    # Build DataFrame
+    # Load the cached and fresh shards back column-wise
     print("\n[2.4] Building DataFrame...")
-    df = pd.DataFrame(all_rows)
+    df = pq.read_table(shard_files, schema=RAW_SCHEMA).to_pandas(date_as_object=False)
 
-    # Clean up
-    # Parse period_end as date
-    df["period_end"] = pd.to_datetime(df["period_end"], errors="coerce")
-    df = df.dropna(subset=["period_end", "company_number"])
+    # Clean up — workers already dropped rows without a valid period date
+    df = df.dropna(subset=["company_number"])
 
     # Derive year
     df["year"] = df["period_end"].dt.year
@@ -390,14 +584,18 @@ def parse_all_accounts(accounts_dir, output_parquet, workers=8):
     # Remove obviously bad data
     df = df[(df["year"] >= 2000) & (df["year"] <= 2026)]
 
-    # Deduplicate: keep one row per company per year (prefer the one with most data)
-    df["data_count"] = df.notna().sum(axis=1)
-    df = df.sort_values("data_count", ascending=False).drop_duplicates(
+    # Deduplicate: keep one row per company per year (prefer the one with most
+    # data). A single sort puts the fullest row first in each (company, year)
+    # run and leaves the output in company/year order — company-ordered row
+    # groups keep company_number runs together for dictionary/RLE encoding
+    # and give tight min/max stats for pushdown.
+    df = df.astype(OUTPUT_DTYPES)
+    df["data_count"] = df.notna().sum(axis=1).astype("int8")
+    df = df.sort_values(
+        ["company_number", "year", "data_count"], ascending=[True, True, False]
+    ).drop_duplicates(
         subset=["company_number", "year"], keep="first"
-    ).drop(columns=["data_count"])
-
-    # Sort
-    df = df.sort_values(["company_number", "year"]).reset_index(drop=True)
+    ).drop(columns=["data_count"]).reset_index(drop=True)
 
     # Stats
     print(f"\n[2.5] Dataset summary:")
@@ -413,7 +611,16 @@ def parse_all_accounts(accounts_dir, output_parquet, workers=8):
 
     # Save as Parquet (very efficient for columnar data)
     print(f"\n[2.6] Saving to {output_parquet}...")
-    df.to_parquet(output_parquet, index=False, engine="pyarrow")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(
+        table, output_parquet,
+        sorting_columns=[
+            pq.SortingColumn(table.schema.get_field_index("company_number")),
+            pq.SortingColumn(table.schema.get_field_index("year")),
+        ],
+        **OUTPUT_PARQUET_OPTIONS,
+    )
+    del table
     size_mb = os.path.getsize(output_parquet) / 1024 / 1024
     print(f"  [ok] Saved ({size_mb:.1f} MB)")
 
@@ -424,5 +631,8 @@ if __name__ == "__main__":
     parser.add_argument("accounts_dir", help="Directory with extracted accounts")
     parser.add_argument("output", help="Output parquet path")
     parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore cached shards and re-parse every directory")
     args = parser.parse_args()
-    parse_all_accounts(args.accounts_dir, args.output, workers=args.workers)
+    parse_all_accounts(args.accounts_dir, args.output, workers=args.workers,
+                       reuse_shards=not args.full)
@@ -8,24 +8,81 @@ Both are free, open data, no API key required.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import io
 import re
 import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 import json
 import time
+import heapq
+import threading
+from functools import lru_cache
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
+
+# lxml is optional here (not in requirements.txt) — stdlib ElementTree is the fallback
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+# orjson is optional (not in requirements.txt) — it decodes API bodies faster
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+import disk_cache
+
+# ── HTTP session ──
+# One pooled session so repeat lookups reuse the keep-alive TLS connection
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Clearview/1.0"})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
 
 # ── Rate limiting ──
+# Both sources are queried concurrently (and from several request threads),
+# so the last-call timestamps are guarded by a lock each
 _last_gazette = 0
 _last_contracts = 0
+_gazette_lock = threading.Lock()
+_contracts_lock = threading.Lock()
 
 
 def _gazette_rate_limit():
     """Rate limit gazette requests — 2 seconds between calls."""
     global _last_gazette
-    elapsed = time.time() - _last_gazette
-    if elapsed < 2:
-        time.sleep(2 - elapsed)
-    _last_gazette = time.time()
+    with _gazette_lock:
+        elapsed = time.time() - _last_gazette
+        if elapsed < 2:
+            time.sleep(2 - elapsed)
+        _last_gazette = time.time()
+
+
+def _contracts_rate_limit():
+    """Rate limit Contracts Finder requests — 1 second between calls."""
+    global _last_contracts
+    with _contracts_lock:
+        elapsed = time.time() - _last_contracts
+        if elapsed < 1:
+            time.sleep(1 - elapsed)
+        _last_contracts = time.time()
+
+
+# ── Name cleaning ──
+# Trailing company-type suffixes (" LTD", " LIMITED.", "PLC LIMITED" ...) hurt search matching
+_SUFFIX_RE = re.compile(r"(?:\s+(?:LIMITED|LTD|PLC|LLP|CIC)\.?)+$", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _clean_company_name(name):
+    """Strip whitespace and trailing company-type suffixes from a name."""
+    return _SUFFIX_RE.sub("", name.strip()).strip()
 
 
 # ═══════════════════════════════════════════════════════════
@@ -48,6 +105,26 @@ GAZETTE_NOTICE_TYPES = {
     "2600": "Striking off",
 }
 
+# Notice code → (severity, notice type), in the same vocabulary as _classify_notice
+_CODE_SEVERITY = {
+    "2450": ("critical", "Winding-up petition"),
+    "2451": ("critical", "Winding-up order"),
+    "2452": ("critical", "Liquidation"),
+    "2410": ("critical", "Administration"),
+    "2411": ("critical", "Administration"),
+    "2421": ("critical", "Receivership"),
+    "2432": ("high", "Voluntary arrangement"),
+    "2440": ("critical", "Liquidation"),
+    "2441": ("critical", "Liquidation"),
+    "2443": ("critical", "Liquidation"),
+    "2447": ("critical", "Liquidation"),
+    "2461": ("positive", "Petition dismissed"),
+    "2600": ("high", "Striking off"),
+}
+
+# Notices change slowly — successful searches are reused for a few hours
+GAZETTE_CACHE_TTL = 6 * 3600
+
 
 def search_gazette(company_name, company_number=None):
     """Search The Gazette for insolvency notices about a company.
@@ -60,15 +137,16 @@ def search_gazette(company_name, company_number=None):
     notices = []
 
     # Clean company name for search
-    clean_name = company_name.strip()
-    # Remove common suffixes for better matching
-    for suffix in [" LIMITED", " LTD", " PLC", " LLP", " CIC"]:
-        if clean_name.upper().endswith(suffix):
-            clean_name = clean_name[:len(clean_name)-len(suffix)].strip()
+    clean_name = _clean_company_name(company_name)
 
     if len(clean_name) < 3:
         return notices
 
+    cache_key = f"gazette:{clean_name.upper()}:{company_number or ''}"
+    cached = disk_cache.get(cache_key, GAZETTE_CACHE_TTL)
+    if cached is not None:
+        return cached
+
     try:
         _gazette_rate_limit()
 
@@ -84,13 +162,16 @@ def search_gazette(company_name, company_number=None):
             "User-Agent": "Mozilla/5.0 (compatible; Clearview/1.0)",
         }
 
-        resp = requests.get(url, params=params, headers=headers, timeout=8)
+        resp = _SESSION.get(url, params=params, headers=headers, timeout=8)
+        parsed = False
         if resp.status_code == 200:
             try:
                 data = resp.json()
                 notices = _parse_json_feed(data, company_name, company_number)
+                parsed = True
                 if notices:
                     print(f"[Gazette] Found {len(notices)} notices for {company_name}")
+                    disk_cache.put(cache_key, notices)
                     return notices
             except (ValueError, TypeError):
                 pass
@@ -99,17 +180,22 @@ def search_gazette(company_name, company_number=None):
         if resp.status_code != 200:
             url = "https://www.thegazette.co.uk/all-notices/notice/data.feed"
             headers["Accept"] = "application/atom+xml"
-            resp = requests.get(url, params=params, headers=headers, timeout=8)
+            resp = _SESSION.get(url, params=params, headers=headers, timeout=8)
             if resp.status_code == 200 and len(resp.text) > 100:
                 notices = _parse_atom_feed(resp.text, company_name, company_number)
+                parsed = True
                 if notices:
                     print(f"[Gazette] Found {len(notices)} notices (Atom) for {company_name}")
+                    disk_cache.put(cache_key, notices)
                     return notices
 
         if resp.status_code == 403:
             print(f"[Gazette] 403 Forbidden — API may require different headers")
         elif resp.status_code != 200:
             print(f"[Gazette] HTTP {resp.status_code}")
+        elif parsed:
+            # A clean "no notices" answer is worth caching too
+            disk_cache.put(cache_key, notices)
 
     except Exception as e:
         print(f"[Gazette] Error searching for {company_name}: {e}")
@@ -117,25 +203,40 @@ def search_gazette(company_name, company_number=None):
     return notices
 
 
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def _iter_atom_entries(xml_text):
+    """Yield Atom <entry> elements as they finish parsing, without building the whole tree."""
+    source = io.BytesIO(xml_text.encode("utf-8"))
+    if LET is not None:
+        events = LET.iterparse(source, events=("end",), tag=ATOM_NS + "entry")
+    else:
+        events = (item for item in ET.iterparse(source, events=("end",))
+                  if item[1].tag == ATOM_NS + "entry")
+    for _, elem in events:
+        yield elem
+        elem.clear()
+
+
 def _parse_atom_feed(xml_text, company_name, company_number):
     """Parse Atom XML feed from Gazette."""
     notices = []
     try:
-        root = ET.fromstring(xml_text)
-        ns = {"atom": "http://www.w3.org/2005/Atom"}
-
-        for entry in root.findall("atom:entry", ns):
-            title_el = entry.find("atom:title", ns)
-            published_el = entry.find("atom:published", ns)
-            updated_el = entry.find("atom:updated", ns)
-            link_el = entry.find("atom:link", ns)
-            content_el = entry.find("atom:content", ns)
+        for entry in _iter_atom_entries(xml_text):
+            title_el = entry.find(ATOM_NS + "title")
+            published_el = entry.find(ATOM_NS + "published")
+            updated_el = entry.find(ATOM_NS + "updated")
+            link_el = entry.find(ATOM_NS + "link")
+            content_el = entry.find(ATOM_NS + "content")
 
             title = title_el.text if title_el is not None and title_el.text else ""
             pub_date = (published_el.text if published_el is not None else
                        updated_el.text if updated_el is not None else "")
             link = link_el.get("href", "") if link_el is not None else ""
             content = content_el.text if content_el is not None else ""
+            code_el = entry.find("{*}notice-code")
+            code = code_el.text.strip() if code_el is not None and code_el.text else None
 
             # Try to match company number in content
             if company_number and company_number.upper() not in (content + title).upper():
@@ -143,10 +244,12 @@ def _parse_atom_feed(xml_text, company_name, company_number):
                 if company_name.upper()[:20] not in (content + title).upper():
                     continue
 
-            notice = _classify_notice(title, pub_date[:10], link)
+            notice = _classify_notice(title, pub_date[:10], link, code)
             notices.append(notice)
+            if len(notices) >= 10:
+                break
 
-    except ET.ParseError:
+    except (ET.ParseError, SyntaxError):
         pass
     return notices[:10]
 
@@ -158,7 +261,7 @@ def _parse_json_feed(data, company_name, company_number):
     if isinstance(entries, dict):
         entries = [entries]
 
-    for entry in entries:
+    for entry in entries[:10]:
         title = entry.get("title", "")
         if isinstance(title, dict):
             title = title.get("#text", str(title))
@@ -172,23 +275,26 @@ def _parse_json_feed(data, company_name, company_number):
                 link = l.get("@href", "")
                 break
 
-        notice = _classify_notice(str(title), pub_date, link)
+        code = entry.get("f:notice-code", entry.get("notice-code", entry.get("categoryCode")))
+        notice = _classify_notice(str(title), pub_date, link, str(code).strip() if code else None)
         notices.append(notice)
 
     return notices[:10]
 
 
+# Notice titles and dates in Gazette HTML search results
+_HTML_NOTICE_RE = re.compile(
+    r'class="[^"]*notice-title[^"]*"[^>]*>([^<]+)</[^>]+>.*?'
+    r'(\d{1,2}\s+\w+\s+\d{4})',
+    re.DOTALL | re.IGNORECASE
+)
+
+
 def _parse_html_results(html, company_name, company_number):
     """Parse HTML search results as last resort."""
     notices = []
     # Simple regex extraction from Gazette HTML results
-    # Look for notice titles and dates
-    notice_pattern = re.compile(
-        r'class="[^"]*notice-title[^"]*"[^>]*>([^<]+)</[^>]+>.*?'
-        r'(\d{1,2}\s+\w+\s+\d{4})',
-        re.DOTALL | re.IGNORECASE
-    )
-    for match in notice_pattern.finditer(html):
+    for match in _HTML_NOTICE_RE.finditer(html):
         title = match.group(1).strip()
         date = match.group(2).strip()
         notice = _classify_notice(title, date, "")
@@ -197,44 +303,55 @@ def _parse_html_results(html, company_name, company_number):
     return notices[:10]
 
 
-def _classify_notice(title, date, url):
-    """Classify a gazette notice by severity."""
-    title_lower = title.lower()
-
-    # Determine notice type and severity
-    if "winding" in title_lower and "petition" in title_lower:
-        severity = "critical"
-        notice_type = "Winding-up petition"
-    elif "winding" in title_lower and "order" in title_lower:
-        severity = "critical"
-        notice_type = "Winding-up order"
-    elif "administration" in title_lower:
-        severity = "critical"
-        notice_type = "Administration"
-    elif "liquidat" in title_lower:
-        severity = "critical"
-        notice_type = "Liquidation"
-    elif "receiver" in title_lower:
-        severity = "critical"
-        notice_type = "Receivership"
-    elif "voluntary arrangement" in title_lower:
-        severity = "high"
-        notice_type = "Voluntary arrangement"
-    elif "striking off" in title_lower or "strike off" in title_lower:
-        severity = "high"
-        notice_type = "Striking off"
-    elif "dismissal" in title_lower:
-        severity = "positive"
-        notice_type = "Petition dismissed"
+# ── Notice classification ──
+# One pass collects every keyword in the title; rules are then checked in
+# priority order, so "liquidator ... administration" is still Administration
+_NOTICE_KEYWORDS_RE = re.compile(
+    r"(?P<winding>winding)|(?P<petition>petition)|(?P<order>order)"
+    r"|(?P<administration>administration)|(?P<liquidat>liquidat)|(?P<receiver>receiver)"
+    r"|(?P<arrangement>voluntary arrangement)|(?P<strike>strik(?:e|ing) off)|(?P<dismissal>dismissal)",
+    re.IGNORECASE
+)
+
+# (required keywords, severity, notice type) — first match wins
+_NOTICE_RULES = (
+    (("winding", "petition"), "critical", "Winding-up petition"),
+    (("winding", "order"), "critical", "Winding-up order"),
+    (("administration",), "critical", "Administration"),
+    (("liquidat",), "critical", "Liquidation"),
+    (("receiver",), "critical", "Receivership"),
+    (("arrangement",), "high", "Voluntary arrangement"),
+    (("strike",), "high", "Striking off"),
+    (("dismissal",), "positive", "Petition dismissed"),
+)
+
+
+def _classify_title(title):
+    """Return (severity, notice type) from the keywords in a notice title."""
+    found = {m.lastgroup for m in _NOTICE_KEYWORDS_RE.finditer(title)}
+    if found:
+        for keywords, severity, notice_type in _NOTICE_RULES:
+            if all(k in found for k in keywords):
+                return severity, notice_type
+    return "warning", "Insolvency notice"
+
+
+def _classify_notice(title, date, url, code=None):
+    """Classify a gazette notice by severity.
+
+    A known Gazette notice code decides directly; otherwise the title is scanned.
+    """
+    if code in _CODE_SEVERITY:
+        severity, notice_type = _CODE_SEVERITY[code]
     else:
-        severity = "warning"
-        notice_type = "Insolvency notice"
+        severity, notice_type = _classify_title(title)
 
     return {
         "type": notice_type,
         "title": title[:200],
         "date": date,
         "url": url,
+        "notice_code": code,
         "severity": severity,
     }
 
@@ -249,7 +366,6 @@ def search_contracts(company_name, company_number=None):
     Uses the free Contracts Finder API (no auth needed).
     Returns: {active: [...], total_value: float, total_contracts: int, latest: str}
     """
-    global _last_contracts
     results = {
         "contracts": [],
         "total_value": 0,
@@ -260,20 +376,13 @@ def search_contracts(company_name, company_number=None):
     }
 
     # Clean name
-    clean_name = company_name.strip()
-    for suffix in [" LIMITED", " LTD", " PLC", " LLP", " CIC"]:
-        if clean_name.upper().endswith(suffix):
-            clean_name = clean_name[:len(clean_name)-len(suffix)].strip()
+    clean_name = _clean_company_name(company_name)
 
     if len(clean_name) < 3:
         return results
 
     try:
-        # Rate limit
-        elapsed = time.time() - _last_contracts
-        if elapsed < 1:
-            time.sleep(1 - elapsed)
-        _last_contracts = time.time()
+        _contracts_rate_limit()
 
         # Search awarded contracts
         url = "https://www.contractsfinder.service.gov.uk/Published/Notices/OCDS/Search"
@@ -284,15 +393,15 @@ def search_contracts(company_name, company_number=None):
             "publishedFrom": (datetime.now() - timedelta(days=365*5)).strftime("%Y-%m-%d"),
         }
 
-        resp = requests.get(url, params=params, timeout=15, headers={
-            "Accept": "application/json",
-            "User-Agent": "Clearview/1.0",
-        })
+        resp = _SESSION.get(url, params=params, timeout=15,
+                            headers={"Accept": "application/json"})
 
         if resp.status_code == 200:
-            data = resp.json()
+            data = _json_loads(resp.content)
             releases = data.get("releases", [])
             buyers = set()
+            name_upper = clean_name.upper()
+            skipped = 0
 
             for release in releases[:20]:
                 try:
@@ -307,8 +416,8 @@ def search_contracts(company_name, company_number=None):
                         matched = False
                         for s in suppliers:
                             s_name = s.get("name", "").upper()
-                            if (clean_name.upper() in s_name or
-                                s_name in clean_name.upper() or
+                            if (name_upper in s_name or
+                                s_name in name_upper or
                                 (company_number and
                                  s.get("id", "").endswith(company_number))):
                                 matched = True
@@ -343,14 +452,18 @@ def search_contracts(company_name, company_number=None):
                             if not results["earliest_award"] or award_date < results["earliest_award"]:
                                 results["earliest_award"] = award_date
 
-                except (KeyError, TypeError, ValueError) as e:
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    # Malformed release (e.g. "value": null) — skip it, keep the rest
+                    skipped += 1
                     continue
 
+            if skipped:
+                print(f"[Contracts] Skipped {skipped} malformed release(s) for {company_name}")
+
             results["buyers"] = list(buyers)[:10]
 
-            # Sort contracts by date (newest first)
-            results["contracts"].sort(key=lambda c: c.get("date", ""), reverse=True)
-            results["contracts"] = results["contracts"][:10]
+            # Keep the 10 newest (every contract dict carries a "date" string)
+            results["contracts"] = heapq.nlargest(10, results["contracts"], key=itemgetter("date"))
 
             if results["total_contracts"] > 0:
                 print(f"[Contracts] Found {results['total_contracts']} government contracts for {company_name} "
@@ -374,15 +487,20 @@ def fetch_external_data(company_name, company_number=None):
     gazette = []
     contracts = {"contracts": [], "total_value": 0, "total_contracts": 0}
 
-    try:
-        gazette = search_gazette(company_name, company_number)
-    except Exception as e:
-        print(f"[External] Gazette failed: {e}")
+    # The two sources are independent and network-bound — query them in parallel
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        gazette_future = pool.submit(search_gazette, company_name, company_number)
+        contracts_future = pool.submit(search_contracts, company_name, company_number)
 
-    try:
-        contracts = search_contracts(company_name, company_number)
-    except Exception as e:
-        print(f"[External] Contracts failed: {e}")
+        try:
+            gazette = gazette_future.result()
+        except Exception as e:
+            print(f"[External] Gazette failed: {e}")
+
+        try:
+            contracts = contracts_future.result()
+        except Exception as e:
+            print(f"[External] Contracts failed: {e}")
 
     return {
         "gazette_notices": gazette,
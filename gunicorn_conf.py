@@ -0,0 +1,24 @@
+"""Clearview — gunicorn settings for deployment.
+
+    gunicorn -c gunicorn_conf.py server:app
+
+Requests spend most of their time waiting on Companies House and iXBRL parsing
+already runs in server.py's process pool, so threaded workers give the
+concurrency without gevent's monkey-patching. `python server.py` is still
+fine for local development.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+
+# One process keeps the company cache and in-flight lookups shared;
+# raise WEB_CONCURRENCY only if CPU becomes the limit
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+keepalive = 30
+
+# A cold lookup that falls back to AI PDF parsing can run well past the 30s default
+timeout = 180
+graceful_timeout = 30
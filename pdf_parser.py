@@ -13,12 +13,48 @@ import os
 import io
 import json
 import base64
+import hashlib
+import multiprocessing
 import requests
+from concurrent.futures import ProcessPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional (not in requirements.txt) — it decodes API bodies faster
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# pybase64 is optional — SIMD encoder for the document fallback's large payloads
+try:
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+import disk_cache
 
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 MODEL = "claude-haiku-4-5-20251001"
 MAX_PDF_PAGES = 30  # Aggressive trim — financials are only 4-6 pages
 
+# Pure-Python extractors (pdfplumber / pypdf) split long PDFs into page ranges
+# and extract them in worker processes
+PARALLEL_MIN_PAGES = 40
+PARALLEL_WORKERS = min(4, os.cpu_count() or 1)
+
+# A filed PDF never changes, so extractions are cached by content hash
+PDF_CACHE_TTL = 30 * 86400
+
+# Pooled session — keeps the API connection alive between filings. POSTs are
+# not in Retry's default allowed_methods, so a paid call is never replayed.
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Clearview/1.0"})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=16,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
 EXTRACTION_PROMPT = """You are a financial data extraction tool. Extract the following financial fields from this UK company accounts document. Return ONLY a JSON array (no other text, no markdown, no explanation).
 
 Each element in the array should represent one financial year found in the document. Most accounts contain the current year and a comparative prior year — extract both.
@@ -61,23 +97,37 @@ Rules:
 
 Return ONLY the JSON array. No commentary."""
 
+# Cached extraction results are only valid for the prompt and model that made them
+PROMPT_VERSION = hashlib.blake2b((MODEL + EXTRACTION_PROMPT).encode("utf-8"), digest_size=6).hexdigest()
+
 
 def extract_financials_from_pdf(pdf_bytes):
     """Send a PDF to Claude API and extract structured financial data.
 
     Strategy:
-    1. Try pdfplumber for text extraction (handles complex layouts)
-    2. If that fails, try pypdf
+    1. Try pypdfium2 for text extraction (fast C extractor)
+    2. If that fails, try pypdf, then pdfplumber (handles complex layouts)
     3. If text found, send as cheap text-only API call
     4. If no text, send trimmed PDF as document (more expensive)
     """
+    pdf_key = disk_cache.content_key("pdf", pdf_bytes)
+    cache_key = f"{pdf_key}:{PROMPT_VERSION}"
+    cached = disk_cache.get(cache_key, PDF_CACHE_TTL)
+    if cached is not None:
+        print(f"[PDF Parser] Using cached extraction ({len(cached)} years)")
+        return cached
+
     api_key = os.environ.get("ANTHROPIC_API_KEY")
     if not api_key:
         print("[PDF Parser] No ANTHROPIC_API_KEY set — skipping PDF parsing")
         return []
 
     # Try text extraction first (cheap path)
-    extracted_text = _extract_financial_text(pdf_bytes)
+    extracted_text = disk_cache.get(pdf_key + ":text", PDF_CACHE_TTL)
+    if extracted_text is None:
+        extracted_text = _extract_financial_text(pdf_bytes)
+        if extracted_text:
+            disk_cache.put(pdf_key + ":text", extracted_text)
 
     if extracted_text and len(extracted_text.strip()) >= 200:
         # Truncate if very long
@@ -88,7 +138,7 @@ def extract_financials_from_pdf(pdf_bytes):
         print(f"[PDF Parser] Sending {len(extracted_text)} chars (~{token_est} tokens) of extracted text...")
 
         try:
-            resp = requests.post(
+            resp = _SESSION.post(
                 ANTHROPIC_API_URL,
                 headers={
                     "x-api-key": api_key,
@@ -101,7 +151,10 @@ def extract_financials_from_pdf(pdf_bytes):
                     "messages": [
                         {
                             "role": "user",
-                            "content": "Here is the text extracted from a UK company's annual accounts PDF. Extract the financial data.\n\n---\n\n" + extracted_text + "\n\n---\n\n" + EXTRACTION_PROMPT,
+                            "content": "".join((
+                                "Here is the text extracted from a UK company's annual accounts PDF. Extract the financial data.\n\n---\n\n",
+                                extracted_text, "\n\n---\n\n", EXTRACTION_PROMPT,
+                            )),
                         }
                     ],
                 },
@@ -109,6 +162,7 @@ def extract_financials_from_pdf(pdf_bytes):
             )
             result = _handle_api_response(resp)
             if result is not None and len(result) > 0:
+                disk_cache.put(cache_key, result)
                 return result
             print("[PDF Parser] Text approach returned no data, trying document fallback...")
         except Exception as e:
@@ -118,33 +172,82 @@ def extract_financials_from_pdf(pdf_bytes):
         print("[PDF Parser] Could not extract meaningful text from PDF")
 
     # Fallback: send trimmed PDF as document
-    return _parse_pdf_as_document(pdf_bytes, api_key)
+    result = _parse_pdf_as_document(pdf_bytes, api_key)
+    if result:
+        disk_cache.put(cache_key, result)
+    return result
+
+
+# Text sent to the model: no single page may exceed MAX_PAGE_CHARS (chart or
+# table dumps can run to 100KB of noise) and the whole prompt stays within
+# TEXT_BUDGET, dropping the lowest-scoring pages first
+MAX_PAGE_CHARS = 12000
+TEXT_BUDGET = 50000
+
+# Phrases that mark a page as part of the financial statements
+FINANCIAL_KEYWORDS = (
+    "balance sheet", "statement of financial position",
+    "profit and loss", "income statement", "statement of comprehensive income",
+    "cash flow", "statement of cash flows",
+    "total assets", "net assets", "shareholders' funds", "shareholders' equity",
+    "retained earnings", "called up share capital",
+    "current liabilities", "non-current liabilities", "current assets",
+    "trade and other receivables", "trade and other payables",
+    "revenue", "turnover", "cost of sales", "gross profit",
+    "operating profit", "profit before tax", "profit for the year",
+    "dividends paid", "dividends per share",
+)
+
+
+def _text_is_plentiful(page_texts):
+    """True if at least half the pages have text and there's 2000+ chars overall."""
+    if not page_texts:
+        return False
+    non_empty = sum(1 for p in page_texts if len(p.strip()) > 50)
+    return non_empty >= len(page_texts) / 2 and sum(len(p) for p in page_texts) >= 2000
+
+
+def _clip_page(text):
+    """Cut a page to MAX_PAGE_CHARS, at a line break where possible."""
+    if len(text) <= MAX_PAGE_CHARS:
+        return text
+    cut = text.rfind("\n", 0, MAX_PAGE_CHARS)
+    return text[:cut if cut > MAX_PAGE_CHARS // 2 else MAX_PAGE_CHARS]
+
+
+def _join_pages(scored, page_indices):
+    """Join the chosen pages in document order, within TEXT_BUDGET.
+
+    When over budget, pages are dropped lowest score first (later pages first
+    on ties) rather than truncating whatever happens to come last.
+    """
+    blocks = {i: f"--- Page {i+1} ---\n{_clip_page(scored[i][2])}"
+              for i in page_indices if scored[i][2].strip()}
+    total = sum(len(b) + 2 for b in blocks.values())
+    for i in sorted(blocks, key=lambda i: (scored[i][1], -i)):
+        if total <= TEXT_BUDGET or len(blocks) == 1:
+            break
+        total -= len(blocks.pop(i)) + 2
+    return [blocks[i] for i in sorted(blocks)]
 
 
 def _extract_financial_text(pdf_bytes):
     """Extract text from pages containing financial statements.
 
-    Tries pdfplumber first (better for complex layouts), falls back to pypdf.
+    Tries pypdfium2 first (PDFium's C text extractor), then pypdf, and only
+    runs pdfplumber (better for complex layouts) when pypdf's text is sparse.
     """
-    financial_keywords = [
-        "balance sheet", "statement of financial position",
-        "profit and loss", "income statement", "statement of comprehensive income",
-        "cash flow", "statement of cash flows",
-        "total assets", "net assets", "shareholders' funds", "shareholders' equity",
-        "retained earnings", "called up share capital",
-        "current liabilities", "non-current liabilities", "current assets",
-        "trade and other receivables", "trade and other payables",
-        "revenue", "turnover", "cost of sales", "gross profit",
-        "operating profit", "profit before tax", "profit for the year",
-        "dividends paid", "dividends per share",
-    ]
-
-    # Try pdfplumber first
-    page_texts = _extract_with_pdfplumber(pdf_bytes)
-
-    # Fall back to pypdf
+    # Try pdfium first — far cheaper per page than pdfplumber's layout analysis
+    page_texts = _extract_with_pdfium(pdf_bytes)
+
+    # Then pypdf — several times cheaper than pdfplumber, and good enough
+    # unless it comes back sparse (designed layouts, text in odd encodings)
     if not page_texts:
-        page_texts = _extract_with_pypdf(pdf_bytes)
+        pypdf_texts = _extract_with_pypdf(pdf_bytes)
+        if _text_is_plentiful(pypdf_texts):
+            page_texts = pypdf_texts
+        else:
+            page_texts = _extract_with_pdfplumber(pdf_bytes) or pypdf_texts
 
     if not page_texts:
         return None
@@ -156,7 +259,7 @@ def _extract_financial_text(pdf_bytes):
     scored = []
     for i, text in enumerate(page_texts):
         text_lower = text.lower()
-        score = sum(1 for kw in financial_keywords if kw in text_lower)
+        score = sum(1 for kw in FINANCIAL_KEYWORDS if kw in text_lower)
         scored.append((i, score, text))
 
     # Get pages with financial content (score >= 2)
@@ -174,30 +277,100 @@ def _extract_financial_text(pdf_bytes):
             top = sorted(financial_pages, key=lambda x: x[1], reverse=True)[:30]
             page_indices = sorted(set(i for i, _, _ in top))
 
-        texts = [f"--- Page {i+1} ---\n{scored[i][2]}" for i in page_indices if scored[i][2].strip()]
+        texts = _join_pages(scored, page_indices)
         print(f"[PDF Parser] Found financial content on {len(financial_pages)} pages, using {len(texts)} pages")
         return "\n\n".join(texts)
     else:
         # No keywords — take last 20 pages
         start = max(0, total_pages - 20)
-        texts = [f"--- Page {i+1} ---\n{scored[i][2]}" for i in range(start, total_pages) if scored[i][2].strip()]
+        texts = _join_pages(scored, range(start, total_pages))
         print(f"[PDF Parser] No keyword matches — using last {len(texts)} pages")
         combined = "\n\n".join(texts)
         return combined if len(combined.strip()) >= 200 else None
 
 
-def _extract_with_pdfplumber(pdf_bytes):
-    """Extract text using pdfplumber (better for complex/designed PDFs)."""
+def _extract_with_pdfium(pdf_bytes):
+    """Extract text using pypdfium2 (installed alongside pdfplumber)."""
     try:
-        import pdfplumber
+        import pypdfium2 as pdfium
+        pdf = pdfium.PdfDocument(pdf_bytes)
         pages = []
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            for page in pdf.pages:
+        try:
+            for i in range(len(pdf)):
                 try:
-                    text = page.extract_text() or ""
-                    pages.append(text)
+                    page = pdf[i]
+                    textpage = page.get_textpage()
+                    # PDFium separates lines with \r\n; match the other backends
+                    pages.append((textpage.get_text_range() or "").replace("\r\n", "\n"))
+                    textpage.close()
+                    page.close()
                 except Exception:
                     pages.append("")
+        finally:
+            pdf.close()
+        non_empty = sum(1 for p in pages if len(p.strip()) > 50)
+        print(f"[PDF Parser] pdfium: {len(pages)} pages, {non_empty} with content")
+        if non_empty > 0:
+            return pages
+        return None
+    except ImportError:
+        print("[PDF Parser] pypdfium2 not available")
+        return None
+    except Exception as e:
+        print(f"[PDF Parser] pdfium failed: {e}")
+        return None
+
+
+def _page_texts(pages):
+    """Extract text from each page object, blank on per-page failure."""
+    texts = []
+    for page in pages:
+        try:
+            texts.append(page.extract_text() or "")
+        except Exception:
+            texts.append("")
+    return texts
+
+
+def _extract_page_range(job):
+    """Worker: extract pages [start, stop) of a PDF with the named backend."""
+    backend, pdf_bytes, start, stop = job
+    if backend == "pdfplumber":
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            return _page_texts(pdf.pages[start:stop])
+    from pypdf import PdfReader
+    return _page_texts(PdfReader(io.BytesIO(pdf_bytes)).pages[start:stop])
+
+
+def _extract_parallel(backend, pdf_bytes, total):
+    """Extract a long PDF across worker processes.
+
+    Returns None for short PDFs or when no process pool can be started, so
+    the caller runs its serial loop instead.
+    """
+    if total < PARALLEL_MIN_PAGES or PARALLEL_WORKERS < 2:
+        return None
+    span = -(-total // PARALLEL_WORKERS)
+    jobs = [(backend, pdf_bytes, start, min(start + span, total)) for start in range(0, total, span)]
+    try:
+        # spawn, not fork — the server process has live threads and sockets
+        with ProcessPoolExecutor(max_workers=len(jobs),
+                                 mp_context=multiprocessing.get_context("spawn")) as pool:
+            return [text for chunk in pool.map(_extract_page_range, jobs) for text in chunk]
+    except Exception as e:
+        print(f"[PDF Parser] Parallel {backend} extraction unavailable ({e}), running serially")
+        return None
+
+
+def _extract_with_pdfplumber(pdf_bytes):
+    """Extract text using pdfplumber (better for complex/designed PDFs)."""
+    try:
+        import pdfplumber
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            pages = _extract_parallel("pdfplumber", pdf_bytes, len(pdf.pages))
+            if pages is None:
+                pages = _page_texts(pdf.pages)
         non_empty = sum(1 for p in pages if len(p.strip()) > 50)
         print(f"[PDF Parser] pdfplumber: {len(pages)} pages, {non_empty} with content")
         if non_empty > 0:
@@ -216,13 +389,9 @@ def _extract_with_pypdf(pdf_bytes):
     try:
         from pypdf import PdfReader
         reader = PdfReader(io.BytesIO(pdf_bytes))
-        pages = []
-        for page in reader.pages:
-            try:
-                text = page.extract_text() or ""
-                pages.append(text)
-            except Exception:
-                pages.append("")
+        pages = _extract_parallel("pypdf", pdf_bytes, len(reader.pages))
+        if pages is None:
+            pages = _page_texts(reader.pages)
         non_empty = sum(1 for p in pages if len(p.strip()) > 50)
         print(f"[PDF Parser] pypdf: {len(pages)} pages, {non_empty} with content")
         if non_empty > 0:
@@ -236,36 +405,102 @@ def _extract_with_pypdf(pdf_bytes):
         return None
 
 
-def _trim_pdf_to_financials(pdf_bytes):
-    """Trim a large PDF to just the last N pages for document fallback."""
+def _trim_with_pdfium(pdf_bytes):
+    """Copy the last MAX_PDF_PAGES pages with PDFium. Returns (bytes, total pages)."""
+    import pypdfium2 as pdfium
+    src = pdfium.PdfDocument(pdf_bytes)
     try:
-        from pypdf import PdfReader, PdfWriter
-        reader = PdfReader(io.BytesIO(pdf_bytes))
-        total = len(reader.pages)
-
+        total = len(src)
         if total <= MAX_PDF_PAGES:
-            return pdf_bytes
-
-        # Take last MAX_PDF_PAGES pages
-        writer = PdfWriter()
-        start = total - MAX_PDF_PAGES
-        for i in range(start, total):
-            writer.add_page(reader.pages[i])
-
-        output = io.BytesIO()
-        writer.write(output)
-        trimmed = output.getvalue()
-        print(f"[PDF Parser] Trimmed from {total} to {MAX_PDF_PAGES} pages ({len(trimmed)} bytes)")
+            return pdf_bytes, total
+        dest = pdfium.PdfDocument.new()
+        try:
+            dest.import_pages(src, list(range(total - MAX_PDF_PAGES, total)))
+            output = io.BytesIO()
+            dest.save(output)
+            return output.getvalue(), total
+        finally:
+            dest.close()
+    finally:
+        src.close()
+
+
+def _trim_with_pypdf(pdf_bytes):
+    """Copy the last MAX_PDF_PAGES pages with pypdf. Returns (bytes, total pages)."""
+    from pypdf import PdfReader, PdfWriter
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    total = len(reader.pages)
+    if total <= MAX_PDF_PAGES:
+        return pdf_bytes, total
+
+    writer = PdfWriter()
+    for i in range(total - MAX_PDF_PAGES, total):
+        writer.add_page(reader.pages[i])
+
+    output = io.BytesIO()
+    writer.write(output)
+    return output.getvalue(), total
+
+
+def _trim_pdf_to_financials(pdf_bytes):
+    """Trim a large PDF to just the last N pages for document fallback.
+
+    PDFium does the copy in C; pypdf is the fallback.
+    """
+    for trim in (_trim_with_pdfium, _trim_with_pypdf):
+        try:
+            trimmed, total = trim(pdf_bytes)
+        except Exception as e:
+            print(f"[PDF Parser] Trim failed ({trim.__name__}): {e}")
+            continue
+        if total > MAX_PDF_PAGES:
+            print(f"[PDF Parser] Trimmed from {total} to {MAX_PDF_PAGES} pages ({len(trimmed)} bytes)")
         return trimmed
-    except Exception as e:
-        print(f"[PDF Parser] Trim failed: {e}")
-        return pdf_bytes
+    return pdf_bytes
+
+
+# Stand-in for the base64 PDF while the request skeleton is JSON-encoded
+_PDF_DATA_PLACEHOLDER = "__CLEARVIEW_PDF_BASE64__"
+
+
+def _document_request_body(pdf_b64):
+    """JSON body for the document fallback, with the base64 bytes spliced in.
+
+    Base64 needs no JSON escaping, so the encoded PDF goes into the body as-is
+    instead of being decoded to str and copied again by json.dumps.
+    """
+    skeleton = json.dumps({
+        "model": MODEL,
+        "max_tokens": 2000,
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "document",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "application/pdf",
+                            "data": _PDF_DATA_PLACEHOLDER,
+                        },
+                    },
+                    {
+                        "type": "text",
+                        "text": EXTRACTION_PROMPT,
+                    },
+                ],
+            }
+        ],
+    }).encode("utf-8")
+    head, tail = skeleton.split(_PDF_DATA_PLACEHOLDER.encode("ascii"))
+    return b"".join((head, pdf_b64, tail))
 
 
 def _parse_pdf_as_document(pdf_bytes, api_key):
     """Fallback: send trimmed PDF as a document to Claude."""
     pdf_bytes = _trim_pdf_to_financials(pdf_bytes)
-    pdf_b64 = base64.b64encode(pdf_bytes).decode("utf-8")
+    pdf_b64 = _b64.b64encode(pdf_bytes)
+    del pdf_bytes
 
     size_mb = len(pdf_b64) / (1024 * 1024)
     if size_mb > 30:
@@ -275,36 +510,14 @@ def _parse_pdf_as_document(pdf_bytes, api_key):
     print(f"[PDF Parser] Sending {size_mb:.1f}MB trimmed PDF as document (~{MAX_PDF_PAGES} pages)...")
 
     try:
-        resp = requests.post(
+        resp = _SESSION.post(
             ANTHROPIC_API_URL,
             headers={
                 "x-api-key": api_key,
                 "anthropic-version": "2023-06-01",
                 "Content-Type": "application/json",
             },
-            json={
-                "model": MODEL,
-                "max_tokens": 2000,
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "document",
-                                "source": {
-                                    "type": "base64",
-                                    "media_type": "application/pdf",
-                                    "data": pdf_b64,
-                                },
-                            },
-                            {
-                                "type": "text",
-                                "text": EXTRACTION_PROMPT,
-                            },
-                        ],
-                    }
-                ],
-            },
+            data=_document_request_body(pdf_b64),
             timeout=90,
         )
         result = _handle_api_response(resp)
@@ -314,6 +527,24 @@ def _parse_pdf_as_document(pdf_bytes, api_key):
         return []
 
 
+# Money fields in each extracted record, coerced to whole pounds
+_NUMERIC_FIELDS = (
+    "turnover", "cost_of_sales", "gross_profit", "ebit",
+    "net_profit", "total_assets", "current_assets", "fixed_assets",
+    "total_liabilities", "current_liabilities", "non_current_liabilities",
+    "net_assets", "cash", "retained_earnings", "share_capital",
+    "dividends_paid",
+)
+
+
+def _to_int(val):
+    """Round a number or numeric string to int; None if it isn't one."""
+    try:
+        return int(round(float(val)))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
 def _handle_api_response(resp):
     """Parse and validate Claude's response."""
     if resp.status_code != 200:
@@ -325,7 +556,7 @@ def _handle_api_response(resp):
             pass
         return None
 
-    data = resp.json()
+    data = _json_loads(resp.content)
     text = ""
     for block in data.get("content", []):
         if block.get("type") == "text":
@@ -341,8 +572,8 @@ def _handle_api_response(resp):
         text = text[4:].strip()
 
     try:
-        records = json.loads(text)
-    except json.JSONDecodeError as e:
+        records = _json_loads(text)
+    except ValueError as e:
         print(f"[PDF Parser] JSON parse failed: {e}")
         return None
 
@@ -355,17 +586,10 @@ def _handle_api_response(resp):
         if not isinstance(r, dict) or not r.get("year"):
             continue
 
-        for field in ["turnover", "cost_of_sales", "gross_profit", "ebit",
-                      "net_profit", "total_assets", "current_assets", "fixed_assets",
-                      "total_liabilities", "current_liabilities", "non_current_liabilities",
-                      "net_assets", "cash", "retained_earnings", "share_capital",
-                      "dividends_paid"]:
+        for field in _NUMERIC_FIELDS:
             val = r.get(field)
-            if val is not None:
-                try:
-                    r[field] = int(round(float(val)))
-                except (ValueError, TypeError):
-                    r[field] = None
+            if val is not None and type(val) is not int:
+                r[field] = _to_int(val)
 
         if r.get("employees") is not None:
             try:
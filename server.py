@@ -7,18 +7,45 @@ Then open http://localhost:5001 in your browser.
 """
 
 import os
+import atexit
 import json
 import sys
-import traceback
+import time
+import heapq
+import queue
+import hashlib
+import logging
+import logging.handlers
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import OrderedDict
+from operator import itemgetter
 from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
+# orjson is optional (not in requirements.txt) — it makes jsonify several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# whitenoise is optional — serves /static/* from memoised file metadata without entering Flask
+try:
+    from whitenoise import WhiteNoise
+except ImportError:
+    WhiteNoise = None
+
 from ch_api import CompaniesHouseClient, build_company_data
 from accounts_parser import extract_financials_from_ixbrl, format_for_frontend
 from pdf_parser import extract_financials_from_pdf
 from distress_predictor import predict_distress
 from clearview_score import assess_company
 from external_data import fetch_external_data
+from sic_codes import SIC_DESCRIPTIONS
+import disk_cache
 
 # ── Config ──
 API_KEY = os.environ.get("CH_API_KEY")
@@ -28,13 +55,153 @@ if not API_KEY:
     sys.exit(1)
 PORT = int(os.environ.get("PORT", 5001))
 
+# ── Logging: request threads queue records, one background thread writes them ──
+logger = logging.getLogger("clearview")
+logger.setLevel(os.environ.get("CV_LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stream = logging.StreamHandler(sys.stdout)
+_log_stream.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+
+# ── JSON responses ──
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask's JSON provider with orjson doing the work.
+
+    Keys stay sorted and dates, Decimals etc. go through Flask's own default
+    hook, so responses match the stock provider. Anything orjson can't
+    handle (indented debug output, huge ints) falls back to the stdlib.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if "indent" not in kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=_ORJSON_OPTS).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, static_folder="static")
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    app.json = OrjsonProvider(app)
 CORS(app)
+if WhiteNoise is not None:
+    # Without it, the static_files route below serves the same files
+    app.wsgi_app = WhiteNoise(app.wsgi_app, root=os.path.join(app.root_path, "static"), prefix="static/")
 
 client = CompaniesHouseClient(API_KEY)
 
-# ── Simple cache to avoid re-fetching ──
-_company_cache = {}
+# ── Company cache: LRU with expiry so memory is bounded and data refreshes ──
+CACHE_SIZE = int(os.environ.get("CV_CACHE_SIZE", 1024))
+CACHE_TTL = int(os.environ.get("CV_CACHE_TTL", 3600))
+_company_cache = OrderedDict()  # number -> (stored_at, data, body, etag), oldest first
+_cache_lock = threading.Lock()
+
+
+def _cache_get(number):
+    """Cached (data, json_body, etag) for a company, or None if missing or expired."""
+    with _cache_lock:
+        entry = _company_cache.get(number)
+        if entry is None:
+            return None
+        if time.time() - entry[0] > CACHE_TTL:
+            del _company_cache[number]
+            return None
+        _company_cache.move_to_end(number)
+        return entry[1:]
+
+
+def _cache_put(number, data):
+    """Serialise and store company data, evicting the least recently used
+    beyond CACHE_SIZE. Returns (json_body, etag)."""
+    # Serialise once here so cache hits can send the stored bytes as-is
+    body = (app.json.dumps(data, separators=(",", ":")) + "\n").encode("utf-8")
+    etag = hashlib.md5(body).hexdigest()
+    with _cache_lock:
+        _company_cache[number] = (time.time(), data, body, etag)
+        _company_cache.move_to_end(number)
+        while len(_company_cache) > CACHE_SIZE:
+            _company_cache.popitem(last=False)
+    return body, etag
+
+
+def _json_body_response(body, etag):
+    """Send pre-serialised JSON with an ETag; 304 if the client already has it.
+
+    Browsers and proxies may reuse it for as long as we'd cache it ourselves.
+    """
+    resp = app.response_class(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.cache_control.public = True
+    resp.cache_control.max_age = CACHE_TTL
+    return resp.make_conditional(request)
+
+
+# ── Shared pool for filing document downloads (I/O-bound, shared across requests) ──
+_doc_pool = ThreadPoolExecutor(max_workers=8)
+
+
+def _fetch_filing_document(metadata_url):
+    """Download a filing's iXBRL. PDF-only filings are just located, not downloaded —
+    returns (content, content_type, pdf_url) so the PDF fallback can fetch them if needed."""
+    content_url, mime = client.get_document_metadata(metadata_url)
+    if not content_url:
+        return None, None, None
+    if mime == "application/pdf":
+        return None, mime, content_url
+    content, content_type = client.get_document_body(content_url, mime)
+    return content, content_type, None
+
+
+# ── iXBRL parsing (BeautifulSoup, CPU-bound) runs in worker processes ──
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def _get_parse_pool():
+    """Start the parse pool on first use — never at import, since spawned
+    workers re-import this module."""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None and PARSE_WORKERS > 1:
+            # spawn, not fork — this process has live threads and sockets
+            _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                              mp_context=multiprocessing.get_context("spawn"))
+        return _parse_pool
+
+
+def _reset_parse_pool():
+    """Drop a broken pool so the next request starts a fresh one."""
+    global _parse_pool
+    with _parse_pool_lock:
+        _parse_pool = None
+
+
+def _submit_ixbrl_parse(content):
+    """Parse an iXBRL document in the pool; inline if there's no usable pool."""
+    pool = _get_parse_pool()
+    if pool is not None:
+        try:
+            return pool.submit(extract_financials_from_ixbrl, content)
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning(f"[Clearview] Parse pool unavailable ({e}), parsing inline")
+            _reset_parse_pool()
+    future = Future()
+    try:
+        future.set_result(extract_financials_from_ixbrl(content))
+    except Exception as e:
+        future.set_exception(e)
+    return future
 
 
 @app.route("/api/ping")
@@ -42,11 +209,6 @@ def ping():
     return jsonify({"status": "ok", "key": API_KEY[:8] + "..."})
 
 
-# ── SIC code descriptions (common ones) ──
-SIC_DESCRIPTIONS = {}
-# We'll populate this from the API responses themselves
-
-
 @app.route("/")
 def landing():
     return send_from_directory("static", "landing.html")
@@ -78,173 +240,286 @@ def search():
     try:
         results = client.search(q, items_per_page=15)
         # Simplify for frontend
-        items = []
-        for r in results:
-            addr = r.get("address", {})
-            items.append({
-                "company_name": r.get("title", ""),
-                "company_number": r.get("company_number", ""),
-                "company_status": r.get("company_status", ""),
-                "type": r.get("company_type", ""),
-                "date_of_creation": r.get("date_of_creation", ""),
-                "address_snippet": r.get("address_snippet", ""),
-                "sic_codes": r.get("sic_codes"),
-                "locality": addr.get("locality", ""),
-            })
+        items = [{
+            "company_name": r.get("title", ""),
+            "company_number": r.get("company_number", ""),
+            "company_status": r.get("company_status", ""),
+            "type": r.get("company_type", ""),
+            "date_of_creation": r.get("date_of_creation", ""),
+            "address_snippet": r.get("address_snippet", ""),
+            "sic_codes": r.get("sic_codes"),
+            "locality": (r.get("address") or {}).get("locality", ""),
+        } for r in results]
         return jsonify({"items": items})
     except Exception as e:
-        traceback.print_exc()
+        logger.exception(f"[Clearview] {request.path} failed: {e}")
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/company/<number>")
-def company(number):
-    """Get full company data including parsed financials."""
-    number = number.strip().upper()
+def _build_company(number):
+    """Assemble full company data, yielding (kind, payload) events as it goes.
 
-    # Check cache
-    if number in _company_cache:
-        return jsonify(_company_cache[number])
+    Yields "profile" once the Companies House profile is in, "financials" for
+    each filing that parses, then "company" with the cached (body, etag) pair.
+    Yields "missing" instead if the company doesn't exist.
+    """
+    logger.info(f"[Clearview] Fetching data for {number}...")
 
-    try:
-        print(f"[Clearview] Fetching data for {number}...")
-        data = build_company_data(client, number)
-        if not data:
-            return jsonify({"error": "Company not found"}), 404
+    # Download up to 4 years of documents concurrently, starting as soon as the
+    # filings list is in rather than after officers, charges, Gazette etc.
+    downloads = []
 
-        # ── Attempt to parse financials from iXBRL filings ──
-        financials = []
-        pdf_filings = []  # Save PDF filings for fallback
-        filings = data.get("accounts_filings", [])
+    def start_downloads(filings):
+        downloads.extend(
+            (filing, _doc_pool.submit(_fetch_filing_document, filing["links"]["document_metadata"]))
+            for filing in filings[:4]
+            if filing.get("links", {}).get("document_metadata")
+        )
 
-        print(f"[Clearview] Found {len(filings)} accounts filings, attempting iXBRL parse...")
+    data = build_company_data(client, number, on_filings=start_downloads)
+    if not data:
+        yield "missing", None
+        return
 
-        for filing in filings[:4]:  # Parse up to 4 years
-            doc_meta_link = filing.get("links", {}).get("document_metadata")
-            if not doc_meta_link:
-                continue
+    # Add SIC description
+    sic_codes = data.get("sic_codes", [])
+    data["sic_desc"] = get_sic_description(sic_codes[0]) if sic_codes else ""
+    yield "profile", {k: v for k, v in data.items() if k != "accounts_filings"}
+
+    # ── Attempt to parse financials from iXBRL filings ──
+    financials = []
+    pdf_filings = []  # Save PDF filings for fallback
+    filings = data.get("accounts_filings", [])
 
+    logger.info(f"[Clearview] Found {len(filings)} accounts filings, attempting iXBRL parse...")
+
+    # Hand each iXBRL document to the parse pool as soon as it arrives
+    parses = []
+    for filing, download in downloads:
+        try:
+            content, content_type, pdf_url = download.result()
+            ct = (content_type or "").lower()
+            if content and ("html" in ct or "xml" in ct):
+                parses.append((filing, _submit_ixbrl_parse(content)))
+            elif pdf_url or (content and "pdf" in ct):
+                # Save PDF for later — try iXBRL first, and only download it if we get that far
+                pdf_filings.append((filing, content, pdf_url))
+                logger.info(f"  \u2298 PDF found for {filing.get('date', 'unknown')} — saved for AI parsing")
+            elif content:
+                logger.info(f"  \u2298 Document is {content_type}, skipping")
+            else:
+                logger.warning(f"  \u2717 Could not download document for {filing.get('date', 'unknown')}")
+        except Exception as e:
+            logger.warning(f"  \u2717 Error parsing {filing.get('date', 'unknown')}: {e}")
+            continue
+
+    for filing, parse in parses:
+        try:
+            parsed = parse.result()
+            if parsed:
+                financials.extend(parsed)
+                yield "financials", format_for_frontend(parsed)
+                logger.info(f"  \u2713 Parsed {len(parsed)} period(s) from iXBRL {filing.get('date', 'unknown')}")
+            else:
+                logger.warning(f"  \u2717 No financial data extracted from iXBRL {filing.get('date', 'unknown')}")
+        except BrokenProcessPool as e:
+            logger.warning(f"  \u2717 Error parsing {filing.get('date', 'unknown')}: {e}")
+            _reset_parse_pool()
+        except Exception as e:
+            logger.warning(f"  \u2717 Error parsing {filing.get('date', 'unknown')}: {e}")
+
+    # ── PDF fallback: if iXBRL got nothing, try parsing PDFs with Claude ──
+    if not financials and pdf_filings:
+        logger.info(f"[Clearview] No iXBRL data — trying AI-powered PDF parsing on {len(pdf_filings[:2])} filing(s)...")
+        for filing, pdf_bytes, pdf_url in pdf_filings[:2]:  # Limit to 2 PDFs
             try:
-                content, content_type = client.get_document_content(doc_meta_link)
-                if content and content_type and ("html" in content_type.lower() or "xml" in content_type.lower()):
-                    parsed = extract_financials_from_ixbrl(content)
-                    if parsed:
-                        financials.extend(parsed)
-                        print(f"  \u2713 Parsed {len(parsed)} period(s) from iXBRL {filing.get('date', 'unknown')}")
-                    else:
-                        print(f"  \u2717 No financial data extracted from iXBRL {filing.get('date', 'unknown')}")
-                elif content and content_type and "pdf" in content_type.lower():
-                    # Save PDF for later — try iXBRL first
-                    pdf_filings.append((filing, content))
-                    print(f"  \u2298 PDF found for {filing.get('date', 'unknown')} — saved for AI parsing")
-                elif content:
-                    print(f"  \u2298 Document is {content_type}, skipping")
+                if pdf_bytes is None:
+                    pdf_bytes, _ = client.get_document_body(pdf_url, "application/pdf")
+                    if not pdf_bytes:
+                        logger.warning(f"  \u2717 Could not download PDF for {filing.get('date', 'unknown')}")
+                        continue
+                parsed = extract_financials_from_pdf(pdf_bytes)
+                if parsed:
+                    financials.extend(parsed)
+                    data["pdf_parsed"] = True
+                    yield "financials", format_for_frontend(parsed)
+                    logger.info(f"  \u2713 AI parsed {len(parsed)} period(s) from PDF {filing.get('date', 'unknown')}")
+                    break  # One PDF usually has current + comparative year — enough
                 else:
-                    print(f"  \u2717 Could not download document for {filing.get('date', 'unknown')}")
+                    logger.warning(f"  \u2717 AI PDF parsing returned no data for {filing.get('date', 'unknown')}")
             except Exception as e:
-                print(f"  \u2717 Error parsing {filing.get('date', 'unknown')}: {e}")
+                logger.warning(f"  \u2717 PDF parsing error: {e}")
                 continue
 
-        # ── PDF fallback: if iXBRL got nothing, try parsing PDFs with Claude ──
-        if not financials and pdf_filings:
-            print(f"[Clearview] No iXBRL data — trying AI-powered PDF parsing on {len(pdf_filings[:2])} filing(s)...")
-            for filing, pdf_bytes in pdf_filings[:2]:  # Limit to 2 PDFs
-                try:
-                    parsed = extract_financials_from_pdf(pdf_bytes)
-                    if parsed:
-                        financials.extend(parsed)
-                        data["pdf_parsed"] = True
-                        print(f"  \u2713 AI parsed {len(parsed)} period(s) from PDF {filing.get('date', 'unknown')}")
-                        break  # One PDF usually has current + comparative year — enough
-                    else:
-                        print(f"  \u2717 AI PDF parsing returned no data for {filing.get('date', 'unknown')}")
-                except Exception as e:
-                    print(f"  \u2717 PDF parsing error: {e}")
-                    continue
-
-        # Deduplicate by year and format
-        seen_years = set()
-        unique_financials = []
-        for f in financials:
-            yr = f["year"]
-            if yr not in seen_years:
-                seen_years.add(yr)
-                unique_financials.append(f)
-
-        # ── Fallback: try convert-ixbrl.co.uk if direct parsing got nothing ──
-        if not unique_financials:
-            print(f"[Clearview] Direct iXBRL parsing failed, trying convert-ixbrl.co.uk fallback...")
-            fallback = client.get_financials_from_convert_ixbrl(number)
-            if fallback:
-                unique_financials = fallback
-                print(f"[Clearview] Fallback returned {len(fallback)} period(s)")
-
-        data["financials"] = format_for_frontend(
-            sorted(unique_financials, key=lambda x: x["year"], reverse=True)[:4]
-        )
+    # Deduplicate by year, keeping the first (most recent filing's) entry
+    by_year = {}
+    for f in financials:
+        by_year.setdefault(f["year"], f)
+    unique_financials = list(by_year.values())
+
+    # ── Fallback: try convert-ixbrl.co.uk if direct parsing got nothing ──
+    if not unique_financials:
+        logger.warning(f"[Clearview] Direct iXBRL parsing failed, trying convert-ixbrl.co.uk fallback...")
+        fallback = client.get_financials_from_convert_ixbrl(number)
+        if fallback:
+            unique_financials = fallback
+            yield "financials", format_for_frontend(fallback)
+            logger.info(f"[Clearview] Fallback returned {len(fallback)} period(s)")
+
+    sorted_financials = heapq.nlargest(4, unique_financials, key=itemgetter("year"))
+    data["financials"] = format_for_frontend(sorted_financials)
+
+    # ── Run Clearview Credit Assessment ──
+    try:
+        assessment = assess_company(data, sorted_financials)
+        data["assessment"] = assessment
+        logger.info(f"[Clearview] Score: {assessment['clearview_score']} "
+                    f"({assessment['rating']['grade']} - {assessment['rating']['label']}) "
+                    f"| Credit limit: £{assessment.get('credit_limit', {}).get('limit', '?')} "
+                    f"| Insolvency cases: {assessment.get('insolvency', {}).get('cases', 0)}")
+    except Exception as ae:
+        logger.exception(f"[Clearview] Assessment FAILED: {ae}")
+        data["assessment"] = None
+
+    # ── Run Distress Prediction ──
+    try:
+        prediction = predict_distress(data, sorted_financials)
+        data["distress_prediction"] = prediction
+        if prediction:
+            logger.info(f"[Clearview] Distress probability: {prediction['probability_pct']}% ({prediction['risk_band']})")
+    except Exception as pe:
+        logger.warning(f"[Clearview] Prediction failed: {pe}")
+        data["distress_prediction"] = None
+
+    # ── Fetch External Data (Gazette + Contracts Finder) ──
+    try:
+        external = fetch_external_data(data.get("company_name", ""), number)
+        # Merge gazette notices (replace old ones from ch_api)
+        if external.get("gazette_notices"):
+            data["gazette_notices"] = external["gazette_notices"]
+        # Add government contracts
+        data["government_contracts"] = external.get("government_contracts", {})
+    except Exception as ee:
+        logger.warning(f"[Clearview] External data failed: {ee}")
+        data["government_contracts"] = {"contracts": [], "total_value": 0, "total_contracts": 0}
 
-        # ── Run Clearview Credit Assessment ──
-        sorted_financials = sorted(unique_financials, key=lambda x: x["year"], reverse=True)[:4]
-        try:
-            assessment = assess_company(data, sorted_financials)
-            data["assessment"] = assessment
-            print(f"[Clearview] Score: {assessment['clearview_score']} "
-                  f"({assessment['rating']['grade']} - {assessment['rating']['label']}) "
-                  f"| Credit limit: £{assessment.get('credit_limit', {}).get('limit', '?')} "
-                  f"| Insolvency cases: {assessment.get('insolvency', {}).get('cases', 0)}")
-        except Exception as ae:
-            print(f"[Clearview] Assessment FAILED: {ae}")
-            traceback.print_exc()
-            data["assessment"] = None
-
-        # ── Run Distress Prediction ──
-        try:
-            prediction = predict_distress(data, sorted_financials)
-            data["distress_prediction"] = prediction
-            if prediction:
-                print(f"[Clearview] Distress probability: {prediction['probability_pct']}% ({prediction['risk_band']})")
-        except Exception as pe:
-            print(f"[Clearview] Prediction failed: {pe}")
-            data["distress_prediction"] = None
-
-        # ── Fetch External Data (Gazette + Contracts Finder) ──
-        try:
-            external = fetch_external_data(data.get("company_name", ""), number)
-            # Merge gazette notices (replace old ones from ch_api)
-            if external.get("gazette_notices"):
-                data["gazette_notices"] = external["gazette_notices"]
-            # Add government contracts
-            data["government_contracts"] = external.get("government_contracts", {})
-        except Exception as ee:
-            print(f"[Clearview] External data failed: {ee}")
-            data["government_contracts"] = {"contracts": [], "total_value": 0, "total_contracts": 0}
+    # Remove raw filings data before caching
+    data.pop("accounts_filings", None)
+
+    logger.info(f"[Clearview] Done. {len(data['financials'])} years of financials extracted.")
+    for f in data["financials"]:
+        fields = [k for k, v in f.items() if v is not None and k not in ("year", "period_end")]
+        logger.info(f"  {f['year']}: {', '.join(fields)}")
+
+    # Cache result
+    yield "company", _cache_put(number, data)
 
-        # Remove raw filings data before caching
-        data.pop("accounts_filings", None)
 
-        # Add SIC description
-        sic_codes = data.get("sic_codes", [])
-        data["sic_desc"] = get_sic_description(sic_codes[0]) if sic_codes else ""
+# ── Single-flight: concurrent misses for one company share a single build ──
+_inflight = {}  # company number -> Future of (body, etag), or None if not found
+_inflight_lock = threading.Lock()
 
-        print(f"[Clearview] Done. {len(data['financials'])} years of financials extracted.")
-        for f in data["financials"]:
-            fields = [k for k, v in f.items() if v is not None and k not in ("year", "period_end")]
-            print(f"  {f['year']}: {', '.join(fields)}")
 
-        # Cache result
-        _company_cache[number] = data
+def _company_events(number):
+    """_build_company, but only one build per company runs at a time.
 
-        return jsonify(data)
+    The first request for a company runs the build and sees every event;
+    requests arriving while it runs wait for it and get only the final
+    "company" (or "missing") event.
+    """
+    with _inflight_lock:
+        pending = _inflight.get(number)
+        leader = pending is None
+        if leader:
+            pending = _inflight[number] = Future()
+
+    if not leader:
+        result = pending.result()
+        yield ("missing", None) if result is None else ("company", result)
+        return
 
+    try:
+        for kind, payload in _build_company(number):
+            if kind == "missing":
+                pending.set_result(None)
+            elif kind == "company":
+                pending.set_result(payload)
+            yield kind, payload
     except Exception as e:
-        traceback.print_exc()
+        pending.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(number, None)
+        if not pending.done():
+            # Streaming client went away mid-build
+            pending.set_exception(RuntimeError(f"Lookup for {number} was cancelled"))
+
+
+@app.route("/api/company/<number>")
+def company(number):
+    """Get full company data including parsed financials."""
+    number = number.strip().upper()
+
+    # Check cache
+    cached = _cache_get(number)
+    if cached is not None:
+        _, body, etag = cached
+        return _json_body_response(body, etag)
+
+    try:
+        for kind, payload in _company_events(number):
+            if kind == "missing":
+                return jsonify({"error": "Company not found"}), 404
+            if kind == "company":
+                return _json_body_response(*payload)
+
+    except Exception as e:
+        logger.exception(f"[Clearview] {request.path} failed: {e}")
         return jsonify({"error": str(e)}), 500
 
 
+def _ndjson_line(obj):
+    return (app.json.dumps(obj, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+@app.route("/api/company/<number>/stream")
+def company_stream(number):
+    """Same data as /api/company, streamed as NDJSON so the page can show progress.
+
+    Lines are {"profile": ...}, then {"financials": [...]} per parsed filing,
+    then {"company": ...} with the full result — or {"error": ...}.
+    """
+    number = number.strip().upper()
+
+    def generate():
+        cached = _cache_get(number)
+        if cached is not None:
+            yield b'{"company":' + cached[1].rstrip(b"\n") + b"}\n"
+            return
+        try:
+            for kind, payload in _company_events(number):
+                if kind == "missing":
+                    yield _ndjson_line({"error": "Company not found", "status": 404})
+                elif kind == "company":
+                    yield b'{"company":' + payload[0].rstrip(b"\n") + b"}\n"
+                else:
+                    yield _ndjson_line({kind: payload})
+        except Exception as e:
+            logger.exception(f"[Clearview] Stream for {number} failed: {e}")
+            yield _ndjson_line({"error": str(e)})
+
+    # Ask proxies not to buffer, or the lines arrive all at once
+    return app.response_class(generate(), mimetype="application/x-ndjson",
+                              headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
+
+
 @app.route("/api/cache/clear")
 def clear_cache():
-    """Clear the company data cache."""
-    _company_cache.clear()
+    """Clear the company data cache and the on-disk PDF / Gazette cache."""
+    with _cache_lock:
+        _company_cache.clear()
+    disk_cache.clear()
     return jsonify({"status": "cleared"})
 
 
@@ -264,8 +539,10 @@ def monitor_check():
             number = str(number).strip().upper()
             try:
                 # Use cache if available
-                if number in _company_cache:
-                    data = _company_cache[number]
+                entry = _cache_get(number)
+                cached = entry is not None
+                if cached:
+                    data = entry[0]
                 else:
                     # Quick fetch — profile only, skip heavy parsing
                     data = build_company_data(client, number)
@@ -301,7 +578,7 @@ def monitor_check():
                     "distress_pct": data.get("distress_prediction", {}).get("probability_pct") if data.get("distress_prediction") else None,
                     "alerts": alerts,
                     "gov_contracts": contracts.get("total_contracts", 0) if contracts else 0,
-                    "cached": number in _company_cache,
+                    "cached": cached,
                 }
                 results.append(summary)
 
@@ -311,7 +588,7 @@ def monitor_check():
         return jsonify({"results": results})
 
     except Exception as e:
-        traceback.print_exc()
+        logger.exception(f"[Clearview] {request.path} failed: {e}")
         return jsonify({"error": str(e)}), 500
 
 
@@ -421,59 +698,10 @@ def debug_company(number):
 
 
 def get_sic_description(code):
-    """Get a human-readable SIC code description."""
-    # Common SIC codes - in production this would be a full lookup table
-    SIC = {
-        "01110": "Growing of cereals",
-        "10710": "Manufacture of bread; manufacture of fresh pastry goods and cakes",
-        "11050": "Manufacture of beer",
-        "41100": "Development of building projects",
-        "41201": "Construction of commercial buildings",
-        "41202": "Construction of domestic buildings",
-        "43320": "Joinery installation",
-        "43999": "Other specialised construction activities",
-        "45111": "Sale of new cars and light motor vehicles",
-        "46900": "Non-specialised wholesale trade",
-        "47110": "Retail sale in non-specialised stores with food",
-        "47190": "Other retail sale in non-specialised stores",
-        "55100": "Hotels and similar accommodation",
-        "56101": "Licensed restaurants",
-        "56102": "Unlicensed restaurants and cafes",
-        "56301": "Licensed clubs",
-        "56302": "Public houses and bars",
-        "62011": "Ready-made interactive leisure and entertainment software development",
-        "62012": "Business and domestic software development",
-        "62020": "Information technology consultancy activities",
-        "62090": "Other information technology service activities",
-        "64110": "Central banking",
-        "64191": "Banks",
-        "64209": "Activities of other holding companies",
-        "66220": "Activities of insurance agents and brokers",
-        "68100": "Buying and selling of own real estate",
-        "68201": "Renting and operating of Housing Association real estate",
-        "68202": "Letting and operating of conference and exhibition centres",
-        "68209": "Other letting and operating of own or leased real estate",
-        "69102": "Tax consultancy",
-        "69201": "Accounting and auditing activities",
-        "70100": "Activities of head offices",
-        "70229": "Management consultancy activities other than financial management",
-        "73110": "Advertising agencies",
-        "74100": "Specialised design activities",
-        "82990": "Other business support service activities",
-        "85100": "Pre-primary education",
-        "85200": "Primary education",
-        "86101": "Hospital activities",
-        "86210": "General medical practice activities",
-        "86220": "Specialist medical practice activities",
-        "86230": "Dental practice activities",
-        "86900": "Other human health activities",
-        "87100": "Residential nursing care activities",
-        "93110": "Operation of sports facilities",
-        "93130": "Fitness facilities",
-        "93290": "Other amusement and recreation activities",
-        "96020": "Hairdressing and other beauty treatment",
-    }
-    return SIC.get(code, f"SIC {code}")
+    """Get a human-readable SIC code description ("" if code isn't a 5-digit SIC)."""
+    if not code or len(code) != 5 or not code.isdigit():
+        return ""
+    return SIC_DESCRIPTIONS.get(code) or f"SIC {code}"
 
 
 if __name__ == "__main__":
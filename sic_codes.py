@@ -0,0 +1,56 @@
+"""Clearview — SIC code descriptions.
+
+Common UK SIC 2007 codes and their descriptions. In production this would be
+the full lookup table.
+"""
+
+SIC_DESCRIPTIONS = {
+    "01110": "Growing of cereals",
+    "10710": "Manufacture of bread; manufacture of fresh pastry goods and cakes",
+    "11050": "Manufacture of beer",
+    "41100": "Development of building projects",
+    "41201": "Construction of commercial buildings",
+    "41202": "Construction of domestic buildings",
+    "43320": "Joinery installation",
+    "43999": "Other specialised construction activities",
+    "45111": "Sale of new cars and light motor vehicles",
+    "46900": "Non-specialised wholesale trade",
+    "47110": "Retail sale in non-specialised stores with food",
+    "47190": "Other retail sale in non-specialised stores",
+    "55100": "Hotels and similar accommodation",
+    "56101": "Licensed restaurants",
+    "56102": "Unlicensed restaurants and cafes",
+    "56301": "Licensed clubs",
+    "56302": "Public houses and bars",
+    "62011": "Ready-made interactive leisure and entertainment software development",
+    "62012": "Business and domestic software development",
+    "62020": "Information technology consultancy activities",
+    "62090": "Other information technology service activities",
+    "64110": "Central banking",
+    "64191": "Banks",
+    "64209": "Activities of other holding companies",
+    "66220": "Activities of insurance agents and brokers",
+    "68100": "Buying and selling of own real estate",
+    "68201": "Renting and operating of Housing Association real estate",
+    "68202": "Letting and operating of conference and exhibition centres",
+    "68209": "Other letting and operating of own or leased real estate",
+    "69102": "Tax consultancy",
+    "69201": "Accounting and auditing activities",
+    "70100": "Activities of head offices",
+    "70229": "Management consultancy activities other than financial management",
+    "73110": "Advertising agencies",
+    "74100": "Specialised design activities",
+    "82990": "Other business support service activities",
+    "85100": "Pre-primary education",
+    "85200": "Primary education",
+    "86101": "Hospital activities",
+    "86210": "General medical practice activities",
+    "86220": "Specialist medical practice activities",
+    "86230": "Dental practice activities",
+    "86900": "Other human health activities",
+    "87100": "Residential nursing care activities",
+    "93110": "Operation of sports facilities",
+    "93130": "Fitness facilities",
+    "93290": "Other amusement and recreation activities",
+    "96020": "Hairdressing and other beauty treatment",
+}